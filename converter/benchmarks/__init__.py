@@ -0,0 +1 @@
+"""Benchmarks of the converter, run with `python -m benchmarks`."""
@@ -0,0 +1,207 @@
+"""Time each stage of the converter on synthetic scripts.
+
+Run from the converter directory with `python -m benchmarks`. Each run appends
+a line of JSON per stage and script size to the results file, tagged with the
+current commit, and `--compare` prints the latest timings of two commits side by
+side.
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from io import BytesIO
+from pathlib import Path
+
+from py_pdf_parser.loaders import PDFDocument
+
+from mb_script_convert import normalisations, transcript_utils
+from mb_script_convert.hugo_html import dump
+from mb_script_convert.import_midnight_burger import tag_pdf, tagged_pdf_to_transcript
+from mb_script_convert.pdf_layout import LOAD_PROFILES, LoadProfile, load_pdf
+from mb_script_convert.transcript import Transcript
+
+from .synthetic_pdf import write_screenplay
+
+RESULTS_FILE = Path(__file__).parent / "results.jsonl"
+DEFAULT_PAGES = [5, 50, 500]
+
+type Timings = dict[str, float]
+
+
+def git_commit() -> str:
+    """Get the current commit, marked if the tree has uncommitted changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+class StageTimer:
+    """Keep the fastest time seen for each stage, over several repeats."""
+
+    def __init__(self):
+        self.timings: Timings = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = min(elapsed, self.timings.get(name, elapsed))
+
+
+def _transcript_passes() -> list[tuple[str, Callable[[Transcript], None]]]:
+    return [
+        ("split_short_dialogue", transcript_utils.split_short_dialogue),
+        ("extract_parentheticals", transcript_utils.extract_parentheticals),
+        ("combine_more", transcript_utils.combine_more),
+    ]
+
+
+def run_pipeline(
+    pdf_path: Path, timer: StageTimer, load_profile: LoadProfile
+) -> PDFDocument:
+    """Convert one PDF the same way `import_transcript` does, timing each stage."""
+    with timer.stage("load_file"):
+        pdf = load_pdf(str(pdf_path), load_profile)
+    with timer.stage("tag_pdf"):
+        tag_pdf(pdf)
+    with timer.stage("tagged_pdf_to_transcript"):
+        transcript = tagged_pdf_to_transcript(pdf)
+    for name, transcript_pass in _transcript_passes():
+        with timer.stage(name):
+            transcript_pass(transcript)
+    with timer.stage("normalisations.run_all"):
+        normalisations.run_all(transcript)
+    with timer.stage("dump"):
+        dump(transcript, BytesIO())
+    return pdf
+
+
+def benchmark(
+    pages: int, repeat: int, work_dir: Path, load_profile: LoadProfile
+) -> Timings:
+    pdf_path = work_dir / f"synthetic-{pages}.pdf"
+    write_screenplay(pdf_path, pages)
+    timer = StageTimer()
+    for _ in range(repeat):
+        pdf = run_pipeline(pdf_path, timer, load_profile)
+    assert len(pdf.pages) == pages, "The synthetic script has the wrong length"
+    timer.timings["total"] = sum(timer.timings.values())
+    return timer.timings
+
+
+def record(results_file: Path, commit: str, pages: int, timings: Timings):
+    date = datetime.now(UTC).isoformat(timespec="seconds")
+    with results_file.open("a", encoding="utf-8") as f:
+        for stage, seconds in timings.items():
+            line = {
+                "commit": commit,
+                "date": date,
+                "pages": pages,
+                "stage": stage,
+                "seconds": seconds,
+            }
+            f.write(json.dumps(line) + "\n")
+
+
+def load_results(results_file: Path) -> dict[str, dict[tuple[int, str], float]]:
+    """Read the results file, keeping the latest timings for each commit."""
+    results: dict[str, dict[tuple[int, str], float]] = {}
+    if not results_file.exists():
+        return results
+    with results_file.open("r", encoding="utf-8") as f:
+        for line in f:
+            result = json.loads(line)
+            timings = results.setdefault(result["commit"], {})
+            timings[result["pages"], result["stage"]] = result["seconds"]
+    return results
+
+
+def print_timings(pages: int, timings: Timings):
+    print(f"{pages} pages")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<26} {seconds * 1000:>10.2f} ms")
+
+
+def compare(results_file: Path, base: str, head: str):
+    results = load_results(results_file)
+    for commit in (base, head):
+        if commit not in results:
+            msg = f"No results recorded for {commit} in {results_file}"
+            raise RuntimeError(msg)
+    print(f"{'pages':>5} {'stage':<26} {base:>14} {head:>14} {'change':>8}")
+    for key, before in results[base].items():
+        after = results[head].get(key)
+        if after is None:
+            continue
+        pages, stage = key
+        change = (after - before) / before if before else 0
+        print(
+            f"{pages:>5} {stage:<26} {before * 1000:>11.2f} ms"
+            f" {after * 1000:>11.2f} ms {change:>+8.1%}"
+        )
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks")
+parser.add_argument(
+    "--pages",
+    type=int,
+    nargs="+",
+    default=DEFAULT_PAGES,
+    help="Sizes of the synthetic scripts to convert",
+)
+parser.add_argument(
+    "--repeat", type=int, default=3, help="Keep the fastest of this many runs"
+)
+parser.add_argument("--load-profile", choices=LOAD_PROFILES, default="pdfminer")
+parser.add_argument("--results", type=Path, default=RESULTS_FILE)
+parser.add_argument(
+    "--no-record", action="store_true", help="Don't add the timings to the results"
+)
+parser.add_argument(
+    "--compare",
+    nargs=2,
+    metavar=("BASE", "HEAD"),
+    help="Compare the recorded results of two commits instead of running",
+)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.compare:
+        try:
+            compare(args.results, *args.compare)
+        except RuntimeError as e:
+            parser.error(*e.args)
+    else:
+        # Keep the timings readable; the synthetic scripts are valid anyway
+        logging.basicConfig(level=logging.ERROR)
+        commit = git_commit()
+        with tempfile.TemporaryDirectory() as work_dir:
+            for pages in args.pages:
+                timings = benchmark(
+                    pages, args.repeat, Path(work_dir), args.load_profile
+                )
+                print_timings(pages, timings)
+                if not args.no_record:
+                    record(args.results, commit, pages, timings)
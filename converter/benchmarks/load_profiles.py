@@ -0,0 +1,77 @@
+"""Compare the PDF load profiles, checking that they tag scripts identically.
+
+Run from the converter directory with `python -m benchmarks.load_profiles`,
+optionally passing real scripts to load instead of synthetic ones.
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mb_script_convert.import_midnight_burger import tag_pdf
+from mb_script_convert.pdf_layout import LOAD_PROFILES, LoadProfile, load_pdf
+
+from .synthetic_pdf import write_screenplay
+
+type Tags = list[tuple[int, str, tuple[float, float, float, float], set[str]]]
+
+
+def load_and_tag(pdf_path: Path, profile: LoadProfile) -> tuple[float, Tags]:
+    """Load and tag a PDF, returning the load time and every element's tags."""
+    start = time.perf_counter()
+    pdf = load_pdf(str(pdf_path), profile)
+    elapsed = time.perf_counter() - start
+    tag_pdf(pdf)
+    tags = []
+    for el in pdf.elements:
+        bbox = el.bounding_box
+        box = (bbox.x0, bbox.y0, bbox.x1, bbox.y1)
+        tags.append((el.page_number, el.text(), box, el.tags))
+    return elapsed, tags
+
+
+def compare_profiles(pdf_path: Path, repeat: int) -> bool:
+    """Print the fastest load time of each profile, and whether the tags match."""
+    timings = {}
+    tags = {}
+    for profile in LOAD_PROFILES:
+        runs = [load_and_tag(pdf_path, profile) for _ in range(repeat)]
+        timings[profile] = min(elapsed for elapsed, _ in runs)
+        tags[profile] = runs[0][1]
+    identical = all(tags[profile] == tags[LOAD_PROFILES[0]] for profile in tags)
+    print(
+        f"{pdf_path.name:<32}",
+        *(f"{timings[profile] * 1000:>10.1f} ms" for profile in LOAD_PROFILES),
+        "identical" if identical else "DIFFERENT",
+    )
+    return identical
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks.load_profiles")
+parser.add_argument("PDF", nargs="*", type=Path, help="Scripts to load")
+parser.add_argument(
+    "--pages",
+    type=int,
+    nargs="+",
+    default=[5, 50, 500],
+    help="Sizes of the synthetic scripts to load, if no PDFs are given",
+)
+parser.add_argument("--repeat", type=int, default=3)
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    print(f"{'':<32}", *(f"{profile:>13}" for profile in LOAD_PROFILES))
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdfs = args.PDF
+        if not pdfs:
+            for pages in args.pages:
+                pdf_path = Path(work_dir) / f"synthetic-{pages}.pdf"
+                write_screenplay(pdf_path, pages)
+                pdfs.append(pdf_path)
+        results = [compare_profiles(pdf_path, args.repeat) for pdf_path in pdfs]
+    if not all(results):
+        sys.exit(1)
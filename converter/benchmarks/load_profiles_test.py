@@ -0,0 +1,14 @@
+from pathlib import Path
+
+from .load_profiles import load_and_tag
+from .synthetic_pdf import write_screenplay
+
+
+def test_load_profiles_tag_identically(tmp_path: Path):
+    pdf_path = tmp_path / "synthetic.pdf"
+    write_screenplay(pdf_path, 12)
+
+    _, pdfminer_tags = load_and_tag(pdf_path, "pdfminer")
+    _, screenplay_tags = load_and_tag(pdf_path, "screenplay")
+
+    assert screenplay_tags == pdfminer_tags
@@ -0,0 +1,231 @@
+"""Generate PDFs laid out like the Midnight Burger scripts.
+
+The PDFs are written directly, with one Courier text object per paragraph, so
+that generating them needs nothing beyond the standard library.
+"""
+
+import random
+from collections.abc import Iterator
+from pathlib import Path
+from textwrap import wrap
+from typing import IO
+
+from mb_script_convert.import_midnight_burger import DIALOGUE_INDENT, DIRECTIONS_INDENT
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+FONT_SIZE = 12
+# Courier is monospaced, with every glyph 600/1000 of the font size wide
+CHAR_WIDTH = FONT_SIZE * 0.6
+LEADING = 12
+TOP = 700
+BOTTOM = 72
+PAGE_NUMBER_POSITION = (520, 750)
+DIRECTIONS_WIDTH = 60
+DIALOGUE_WIDTH = 35
+
+# How often each kind of paragraph appears; the rest are character and dialogue
+DIRECTIONS_SHARE = 0.3
+SHORT_DIALOGUE_SHARE = 0.05
+PARENTHETICAL_SHARE = 0.2
+
+CHARACTERS = ["CLEMENTINE", "BUD", "GLORIA", "DUKE", "TED", "BIRDIE", "LANGSTON"]
+PARENTHETICALS = ["(quietly)", "(grumbling)", "(beat)", "(to Bud)", "(laughing)"]
+WORDS = [
+    "the",
+    "a",
+    "diner",
+    "burger",
+    "night",
+    "door",
+    "bell",
+    "radio",
+    "coffee",
+    "grill",
+    "counter",
+    "booth",
+    "neon",
+    "highway",
+    "dust",
+    "storm",
+    "stars",
+    "time",
+    "strange",
+    "light",
+    "open",
+    "closed",
+    "old",
+    "new",
+    "small",
+    "big",
+    "looks",
+    "walks",
+    "turns",
+    "says",
+    "waits",
+    "listens",
+    "laughs",
+    "sighs",
+    "pours",
+    "rings",
+    "flickers",
+    "slowly",
+    "suddenly",
+    "quietly",
+    "again",
+    "never",
+    "always",
+    "here",
+    "there",
+    "outside",
+    "inside",
+]
+
+# A line of text: its x and y position, and the text itself
+type Line = tuple[float, float, str]
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + rng.choice([".", ".", "?", "!"])
+
+
+def _paragraphs(rng: random.Random) -> Iterator[tuple[str | None, float, list[str]]]:
+    """Generate (speaker, indent, lines) for an endless script.
+
+    `speaker` is set for dialogue, so that it can be continued after a page
+    break.
+    """
+    while True:
+        kind = rng.random()
+        if kind < DIRECTIONS_SHARE:
+            direction = " ".join(
+                _sentence(rng, 4, 12) for _ in range(rng.randint(1, 3))
+            )
+            yield None, DIRECTIONS_INDENT, wrap(direction.upper(), DIRECTIONS_WIDTH)
+        elif kind < DIRECTIONS_SHARE + SHORT_DIALOGUE_SHARE:
+            # A short line of dialogue run together with the speaker's name
+            speaker = rng.choice(CHARACTERS)
+            yield None, DIRECTIONS_INDENT, [f"{speaker} {_sentence(rng, 1, 3)}"]
+        else:
+            speaker = rng.choice(CHARACTERS)
+            yield None, DIRECTIONS_INDENT, [speaker]
+            dialogue = " ".join(_sentence(rng, 3, 10) for _ in range(rng.randint(1, 4)))
+            lines = wrap(dialogue, DIALOGUE_WIDTH)
+            if rng.random() < PARENTHETICAL_SHARE:
+                lines.insert(0, rng.choice(PARENTHETICALS))
+            yield speaker, DIALOGUE_INDENT, lines
+
+
+def _centered(y: float, text: str) -> Line:
+    return (PAGE_WIDTH - CHAR_WIDTH * len(text)) / 2, y, text
+
+
+def screenplay(pages: int, seed: int = 0) -> list[list[Line]]:
+    """Lay out a script of `pages` pages.
+
+    The first page is a title page, and every page after it is numbered in the
+    top right. Dialogue which runs over a page break is continued with (MORE)
+    and (CONT'D), and the script finishes with THE END.
+    """
+    rng = random.Random(seed)
+    title = f"Chapter {seed + 1}: A Synthetic Episode"
+    layout = [
+        [_centered(500, "MIDNIGHT BURGER"), _centered(480, title)],
+        [
+            (DIRECTIONS_INDENT, TOP, "MIDNIGHT BURGER:"),
+            (DIRECTIONS_INDENT, TOP - 24, f"{title}."),
+        ],
+    ]
+    y = TOP - 2 * 24
+
+    def new_page():
+        nonlocal y
+        layout.append([])
+        y = TOP
+
+    paragraphs = _paragraphs(rng)
+    while len(layout) < pages:
+        speaker, indent, lines = next(paragraphs)
+        fits = int((y - BOTTOM) // LEADING)
+        if len(lines) > fits:
+            # Leave room for at least one line of dialogue before the (MORE)
+            if speaker is not None and fits > 1:
+                layout[-1].append((indent, y, "\n".join(lines[: fits - 1])))
+                layout[-1].append((DIRECTIONS_INDENT, y - fits * LEADING, "(MORE)"))
+                lines = lines[fits - 1 :]
+                new_page()
+                layout[-1].append((DIRECTIONS_INDENT, y, f"{speaker} (CONT'D)"))
+                y -= 2 * LEADING
+            else:
+                new_page()
+        layout[-1].append((indent, y, "\n".join(lines)))
+        y -= (len(lines) + 1) * LEADING
+
+    layout[-1].append((DIALOGUE_INDENT + 60, max(y, BOTTOM), "THE END"))
+    for number, page in enumerate(layout[1:], 2):
+        page.append((*PAGE_NUMBER_POSITION, f"{number}."))
+    return layout
+
+
+def _escape(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("cp1252")
+
+
+def _content_stream(page: list[Line]) -> bytes:
+    ops = []
+    for x, y, text in page:
+        ops.append(b"BT /F1 %d Tf %d TL %.2f %.2f Td" % (FONT_SIZE, LEADING, x, y))
+        for i, line in enumerate(text.split("\n")):
+            ops.append(b"%s(%s) Tj" % (b"T* " if i else b"", _escape(line)))
+        ops.append(b"ET")
+    return b"\n".join(ops)
+
+
+def write_pdf(layout: list[list[Line]], fh: IO[bytes]):
+    """Write a PDF with each line of text at the given position.
+
+    `layout` has a list of lines for each page. A line may contain newlines, in
+    which case it is written as one block of text.
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # The page tree, filled in once the pages are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier"
+        b" /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in layout:
+        content = _content_stream(page)
+        content_id = len(objects) + 1
+        objects.extend(
+            [
+                b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d]"
+                b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                % (PAGE_WIDTH, PAGE_HEIGHT, content_id),
+            ]
+        )
+        page_ids.append(content_id + 1)
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    fh.write(out)
+
+
+def write_screenplay(path: Path, pages: int, seed: int = 0):
+    with path.open("wb") as fh:
+        write_pdf(screenplay(pages, seed), fh)
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+from mb_script_convert.import_midnight_burger import import_transcript
+
+from .synthetic_pdf import screenplay, write_screenplay
+
+
+def test_screenplay_converts(tmp_path: Path):
+    pages = 8
+    layout = screenplay(pages)
+    assert len(layout) == pages
+    assert any(text == "(MORE)" for page in layout for _, _, text in page)
+
+    pdf_path = tmp_path / "synthetic.pdf"
+    write_screenplay(pdf_path, pages)
+    transcript = import_transcript(str(pdf_path), debug=False)
+
+    assert transcript.metadata.series == "Midnight Burger:"
+    assert transcript.metadata.episode_title == "Chapter 1: A Synthetic Episode."
+    tags = {tag for tag, _ in transcript.content}
+    assert tags == {"direction", "character", "parenthetical", "dialogue", "end"}
+    assert not any(
+        "(MORE)" in text or "CONT'D" in text for _, text in transcript.content
+    )
+    assert transcript.content[-1] == ("end", "THE END")
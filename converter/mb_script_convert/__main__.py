@@ -1,12 +1,25 @@
 import argparse
 import logging
 import sys
+from pathlib import Path
 
-from .main import main
+from .element_cache import element_cache_scope
+from .feeds_cache import cache_scope
+from .main import ConvertOptions, main, watch
+from .manifest import MANIFEST_FILE
+from .pdf_layout import LOAD_PROFILES
+from .scrape_rss import MB_RSS_URL
 
 logger = logging.getLogger(__name__)
 
-MB_RSS_URL = "https://rss.art19.com/midnight-burger"
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        msg = f"must be 0 or more, not {number}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
+
 
 parser = argparse.ArgumentParser()
 parser.add_argument("IN")
@@ -21,25 +34,125 @@ parser.add_argument(
 )
 parser.add_argument(
     "--rss-url",
-    default=MB_RSS_URL,
-    help="Override the URL of the Midnight Burger RSS feed",
+    action="append",
+    help="Override the URL of the Midnight Burger RSS feed; repeat to match"
+    " episodes against several feeds, in order of preference",
+)
+parser.add_argument(
+    "--feed-ttl",
+    type=float,
+    help="Revalidate the RSS feed after this many seconds, rather than once per run",
 )
 parser.add_argument(
     "-O", "--overwrite", action="store_true", help="Allow overwriting the output"
 )
+parser.add_argument(
+    "-j",
+    "--jobs",
+    type=non_negative_int,
+    default=1,
+    help="Number of PDFs to convert in parallel when IN is a directory (0 for one per CPU)",
+)
+parser.add_argument(
+    "-i",
+    "--incremental",
+    action="store_true",
+    help="Only convert PDFs whose content, options or converter changed since the last build",
+)
+parser.add_argument(
+    "--manifest",
+    type=Path,
+    default=MANIFEST_FILE,
+    help="The build manifest used by --incremental",
+)
+parser.add_argument(
+    "--load-profile",
+    choices=LOAD_PROFILES,
+    default="pdfminer",
+    help="How to analyse the layout of the PDF: with pdfminer, or the faster but"
+    " experimental screenplay analysis",
+)
+parser.add_argument(
+    "--element-cache",
+    action="store_true",
+    help="Reuse the text extracted from PDFs which have been loaded before",
+)
+intermediate = parser.add_mutually_exclusive_group()
+intermediate.add_argument(
+    "--save-intermediate",
+    action="store_true",
+    help="Save each imported transcript next to its PDF, as a .mbt file",
+)
+intermediate.add_argument(
+    "--from-intermediate",
+    action="store_true",
+    help="Convert the .mbt files saved by --save-intermediate, instead of PDFs",
+)
+parser.add_argument(
+    "--pagefind-records",
+    type=Path,
+    help="Also write a Pagefind search record of each transcript into this"
+    " directory, for scripts/pagefind.mjs to index. Existing outputs without a"
+    " record get one from their HTML, and records without an output are removed",
+)
+parser.add_argument(
+    "--profile-report",
+    type=Path,
+    help="Time each stage of each conversion, writing the results here as JSON lines",
+)
+parser.add_argument(
+    "-w",
+    "--watch",
+    action="store_true",
+    help="Keep running, and reconvert each PDF under IN whenever it changes",
+)
+parser.add_argument(
+    "--poll-interval",
+    type=float,
+    default=1.0,
+    help="How often --watch checks for changed PDFs, in seconds",
+)
 parser.add_argument("--debug", action="store_true")
 
+
+def run_watch(args: argparse.Namespace, options: ConvertOptions):
+    try:
+        watch(args.IN, args.output, options, args.poll_interval, feed_ttl=args.feed_ttl)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
+
+
 if __name__ == "__main__":
     args = parser.parse_args()
+    if args.watch and not isinstance(args.output, str):
+        parser.error("--watch needs an output file or directory")
+    if args.pagefind_records and not isinstance(args.output, str):
+        parser.error("--pagefind-records needs an output file or directory")
+    options = ConvertOptions(
+        episode_title=args.episode_title,
+        skip_scraping=args.skip_scraping,
+        rss_urls=tuple(args.rss_url or [MB_RSS_URL]),
+        debug=args.debug,
+        load_profile=args.load_profile,
+        element_cache=args.element_cache,
+        save_intermediate=args.save_intermediate,
+        from_intermediate=args.from_intermediate,
+        pagefind_records=str(args.pagefind_records) if args.pagefind_records else None,
+    )
     try:
-        main(
-            args.IN,
-            args.output,
-            args.episode_title,
-            args.skip_scraping,
-            args.rss_url,
-            args.overwrite,
-            args.debug,
-        )
+        with cache_scope(), element_cache_scope():
+            if args.watch:
+                run_watch(args, options)
+            else:
+                main(
+                    args.IN,
+                    args.output,
+                    options,
+                    args.overwrite,
+                    args.jobs,
+                    args.manifest if args.incremental else None,
+                    args.feed_ttl,
+                    args.profile_report,
+                )
     except RuntimeError as e:
         logger.error(*e.args)
@@ -0,0 +1,11 @@
+import hashlib
+from os import environ
+from pathlib import Path
+
+XDG_CACHE_HOME = Path(environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+CACHE_DIR = XDG_CACHE_HOME / "mb-scripts"
+
+
+def cache_key(path: Path) -> str:
+    """Name a file in the cache directory after `path`, wherever it is given from."""
+    return hashlib.sha256(path.resolve().as_posix().encode()).hexdigest()[:16]
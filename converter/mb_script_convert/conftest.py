@@ -0,0 +1,48 @@
+from collections.abc import Callable
+from itertools import starmap
+
+import pytest
+from py_pdf_parser.components import PDFDocument
+from py_pdf_parser.loaders import Page
+
+# US letter, in points
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+CHAR_WIDTH = 7.2
+LINE_HEIGHT = 12
+
+
+class FakeTextBox:
+    """Stands in for a PDFMiner LTTextBox."""
+
+    def __init__(self, x0: float, y0: float, text: str):
+        self.text = text
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x0 + CHAR_WIDTH * max(len(line) for line in text.split("\n"))
+        self.y1 = y0 + LINE_HEIGHT * (text.count("\n") + 1)
+
+    def get_text(self) -> str:
+        return self.text + "\n"
+
+
+type MakeDocument = Callable[[dict[int, list[tuple[float, float, str]]]], PDFDocument]
+
+
+@pytest.fixture
+def make_document() -> MakeDocument:
+    """Make a PDFDocument from (x0, y0, text) elements on each page."""
+
+    def make(pages: dict[int, list[tuple[float, float, str]]]) -> PDFDocument:
+        return PDFDocument(
+            pages={
+                page_number: Page(
+                    width=PAGE_WIDTH,
+                    height=PAGE_HEIGHT,
+                    elements=list(starmap(FakeTextBox, elements)),
+                )
+                for page_number, elements in pages.items()
+            }
+        )
+
+    return make
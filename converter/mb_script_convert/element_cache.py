@@ -0,0 +1,164 @@
+"""A persistent cache of the elements extracted from each PDF.
+
+Loading a PDF is by far the slowest part of a conversion, and its result only
+depends on the PDF and the code which loads it. For each element, this caches
+the page number, bounding box, text and font, which is everything the rest of
+the converter reads from it. The cached elements are keyed by the content hash
+of the PDF, the load profile, and a fingerprint of the loader, so changing the
+tagging or normalisations reuses them while changing the loader does not.
+"""
+
+import hashlib
+import pickle
+import zlib
+from collections.abc import Iterator, MutableMapping
+from contextlib import contextmanager, suppress
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import NamedTuple
+
+from py_pdf_parser.components import PDFDocument
+from py_pdf_parser.loaders import Page
+
+from .cache_dir import CACHE_DIR
+from .manifest import file_digest
+from .pdf_layout import LoadProfile, load_pdf
+from .sqlite_cache import SqliteCache
+
+ELEMENT_CACHE_FILE = CACHE_DIR / "elements.sqlite3"
+
+# The modules and packages whose behaviour changes the extracted elements
+_LOADER_MODULES = ("element_cache.py", "pdf_layout.py")
+_LOADER_DEPENDENCIES = ("pdfminer.six", "py-pdf-parser")
+
+# An element as it is cached: x0, y0, x1, y1, text, font name and font size
+type ElementRecord = tuple[float, float, float, float, str, str, float]
+# A page as it is cached: page number, width, height and elements
+type PageRecord = tuple[int, float, float, list[ElementRecord]]
+
+_cache: SqliteCache | None = None
+
+
+def get_element_cache() -> SqliteCache:
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        # The entries are already compressed pickles, so they are stored as they are
+        _cache = SqliteCache(ELEMENT_CACHE_FILE, dumps=bytes, loads=bytes)
+    return _cache
+
+
+def close_element_cache():
+    global _cache  # noqa: PLW0603
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+@contextmanager
+def element_cache_scope() -> Iterator[None]:
+    """Close the element cache when leaving the block, if it was opened."""
+    try:
+        yield
+    finally:
+        close_element_cache()
+
+
+@cache
+def loader_version() -> str:
+    """Fingerprint the code which extracts the elements from a PDF."""
+    h = hashlib.sha256()
+    package_dir = Path(__file__).parent
+    for module in _LOADER_MODULES:
+        h.update(module.encode())
+        h.update((package_dir / module).read_bytes())
+    for dependency in _LOADER_DEPENDENCIES:
+        with suppress(PackageNotFoundError):
+            h.update(f"{dependency}=={version(dependency)}".encode())
+    return h.hexdigest()
+
+
+def cache_key(pdf_file: Path, profile: LoadProfile) -> str:
+    return f"{file_digest(pdf_file)}:{profile}:{loader_version()}"
+
+
+class CachedChar(NamedTuple):
+    """The font of a cached element, in the shape of a pdfminer LTChar."""
+
+    fontname: str
+    height: float
+
+
+class CachedTextBox:
+    """Stands in for the text box that a cached element was read from.
+
+    py_pdf_parser takes an element's font from the most common font of its
+    characters, so the box holds a single line of one character in that font.
+    """
+
+    __slots__ = ("font", "text", "x0", "x1", "y0", "y1")
+
+    def __init__(self, record: ElementRecord):
+        self.x0, self.y0, self.x1, self.y1, self.text, fontname, height = record
+        self.font = CachedChar(fontname, height)
+
+    def get_text(self) -> str:
+        return self.text
+
+    def __iter__(self) -> Iterator[tuple[CachedChar]]:
+        yield (self.font,)
+
+
+def pack(pdf: PDFDocument) -> bytes:
+    """Compress the elements of a PDF into a cache entry."""
+    pages: list[PageRecord] = []
+    for page in pdf.pages:
+        elements: list[ElementRecord] = []
+        for element in page.elements:
+            box = element.bounding_box
+            elements.append(
+                (
+                    box.x0,
+                    box.y0,
+                    box.x1,
+                    box.y1,
+                    element.text(stripped=False),
+                    element.font_name,
+                    element.font_size,
+                )
+            )
+        pages.append((page.page_number, page.width, page.height, elements))
+    return zlib.compress(pickle.dumps(pages, pickle.HIGHEST_PROTOCOL))
+
+
+def unpack(packed: bytes, pdf_file: str) -> PDFDocument:
+    """Rebuild a PDF from a cache entry made by `pack`."""
+    pages: list[PageRecord] = pickle.loads(zlib.decompress(packed))
+    return PDFDocument(
+        pages={
+            page_number: Page(
+                width=width,
+                height=height,
+                elements=[CachedTextBox(record) for record in elements],
+            )
+            for page_number, width, height, elements in pages
+        },
+        pdf_file_path=pdf_file,
+    )
+
+
+def load_cached_pdf(
+    pdf_file: str,
+    profile: LoadProfile = "pdfminer",
+    element_cache: MutableMapping[str, bytes] | None = None,
+) -> PDFDocument:
+    """Load a PDF like `load_pdf`, reusing its elements from the cache if possible."""
+    if element_cache is None:
+        element_cache = get_element_cache()
+    key = cache_key(Path(pdf_file), profile)
+    packed = element_cache.get(key)
+    if packed is not None:
+        return unpack(packed, pdf_file)
+    pdf = load_pdf(pdf_file, profile)
+    element_cache[key] = pack(pdf)
+    return pdf
@@ -0,0 +1,108 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from pdfminer.layout import LTChar
+from py_pdf_parser.components import PDFDocument
+from py_pdf_parser.loaders import Page
+
+from . import element_cache
+from .element_cache import load_cached_pdf, pack, unpack
+from .pdf_layout import TextBox, TextLine
+
+
+def _line(x0: float, y0: float, text: str, fontname: str, size: float) -> TextLine:
+    chars = []
+    for i, letter in enumerate(text):
+        # Skip LTChar's constructor, which needs a font and a text matrix
+        char = LTChar.__new__(LTChar)
+        char.set_bbox((x0 + 7.2 * i, y0, x0 + 7.2 * (i + 1), y0 + size))
+        char._text = letter
+        char.fontname = fontname
+        chars.append(char)
+    return TextLine(chars)
+
+
+def _document() -> PDFDocument:
+    return PDFDocument(
+        pages={
+            1: Page(
+                width=612,
+                height=792,
+                elements=[TextBox([_line(250, 500, "MIDNIGHT BURGER", "Courier", 12)])],
+            ),
+            3: Page(
+                width=612,
+                height=792,
+                elements=[
+                    TextBox(
+                        [
+                            _line(108, 700, "BUD", "Courier-Bold", 12.04),
+                            _line(108, 688, "Hi", "Courier", 11.96),
+                        ]
+                    ),
+                    TextBox([_line(520, 750, "3.", "Courier", 12)]),
+                ],
+            ),
+        },
+        pdf_file_path="script.pdf",
+    )
+
+
+def _elements(pdf: PDFDocument) -> list[tuple]:
+    return [
+        (
+            el.page_number,
+            el.text(stripped=False),
+            el.bounding_box,
+            el.font_name,
+            el.font_size,
+        )
+        for el in pdf.elements
+    ]
+
+
+def test_pack_round_trip():
+    pdf = _document()
+
+    rebuilt = unpack(pack(pdf), "script.pdf")
+
+    assert _elements(rebuilt) == _elements(pdf)
+    assert [(page.page_number, page.width, page.height) for page in rebuilt.pages] == [
+        (1, 612, 792),
+        (3, 612, 792),
+    ]
+    assert rebuilt.fonts == pdf.fonts
+
+
+@pytest.fixture
+def counting_loader(monkeypatch: pytest.MonkeyPatch) -> Callable[[], int]:
+    loads = []
+
+    def load_pdf(pdf_file: str, profile: str) -> PDFDocument:
+        loads.append((pdf_file, profile))
+        return _document()
+
+    monkeypatch.setattr(element_cache, "load_pdf", load_pdf)
+    return lambda: len(loads)
+
+
+def test_load_cached_pdf(tmp_path: Path, counting_loader: Callable[[], int]):
+    pdf_file = tmp_path / "script.pdf"
+    pdf_file.write_bytes(b"%PDF-1.4 first")
+    cache: dict[str, bytes] = {}
+
+    first = load_cached_pdf(str(pdf_file), "screenplay", cache)
+    second = load_cached_pdf(str(pdf_file), "screenplay", cache)
+    assert counting_loader() == 1
+    assert _elements(second) == _elements(first)
+
+    # Each load profile is cached separately
+    load_cached_pdf(str(pdf_file), "pdfminer", cache)
+    assert counting_loader() == 2  # noqa: PLR2004
+
+    # So is each version of the PDF, regardless of its name
+    pdf_file.write_bytes(b"%PDF-1.4 second")
+    load_cached_pdf(str(pdf_file), "screenplay", cache)
+    assert counting_loader() == 3  # noqa: PLR2004
+    assert len(cache) == 3  # noqa: PLR2004
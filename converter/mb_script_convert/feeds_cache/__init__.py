@@ -1,12 +1,45 @@
-import atexit
-from os import environ
-from pathlib import Path
+"""A persistent cache of fetched RSS feeds.
 
+The cache is opened on first use by `get_cache`, so importing this package, or
+running a conversion which never scrapes, doesn't touch the disk.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from ..cache_dir import CACHE_DIR
+from ..sqlite_cache import SqliteCache
 from .cache import Cache
 
-XDG_CACHE_HOME = Path(environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
-CACHE_FILE = XDG_CACHE_HOME / "mb-scripts" / "cache.pickle"
+CACHE_FILE = CACHE_DIR / "feeds.sqlite3"
+# The whole cache used to be pickled into one file
+LEGACY_CACHE_FILE = CACHE_DIR / "cache.pickle"
+
+_cache: SqliteCache | None = None
+
+
+def get_cache() -> SqliteCache:
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        _cache = SqliteCache(CACHE_FILE)
+        if LEGACY_CACHE_FILE.exists() and len(_cache) == 0:
+            legacy_cache = Cache(LEGACY_CACHE_FILE)
+            legacy_cache.load_cache()
+            _cache.update(legacy_cache)
+    return _cache
+
+
+def close_cache():
+    global _cache  # noqa: PLW0603
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
 
-cache = Cache(CACHE_FILE)
-cache.load_cache()
-atexit.register(cache.save_cache)
+@contextmanager
+def cache_scope() -> Iterator[None]:
+    """Close the cache when leaving the block, if anything inside it was cached."""
+    try:
+        yield
+    finally:
+        close_cache()
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from .. import feeds_cache
+from .cache import Cache
+
+
+def test_cache_opened_lazily(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache_file = tmp_path / "feeds.sqlite3"
+    legacy_cache_file = tmp_path / "cache.pickle"
+    monkeypatch.setattr(feeds_cache, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(feeds_cache, "LEGACY_CACHE_FILE", legacy_cache_file)
+    monkeypatch.setattr(feeds_cache, "_cache", None)
+
+    legacy_cache = Cache(legacy_cache_file)
+    legacy_cache["foo"] = "bar"
+    legacy_cache.save_cache()
+
+    with feeds_cache.cache_scope():
+        assert not cache_file.exists()
+        cache = feeds_cache.get_cache()
+        assert cache_file.exists()
+        assert cache["foo"] == "bar"
+        assert feeds_cache.get_cache() is cache
+    assert feeds_cache._cache is None
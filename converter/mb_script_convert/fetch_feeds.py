@@ -0,0 +1,157 @@
+"""Fetch several RSS feeds at once, revalidating them against the feeds cache.
+
+Each fetch is a blocking urllib request run in a thread, so that feeds are
+fetched concurrently without holding up the event loop. The cache is only used
+from the event loop's thread, as SQLite connections can't be shared between
+threads.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterable, MutableMapping
+from typing import Any
+from urllib.error import HTTPError, URLError
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+import feedparser
+from feedparser import FeedParserDict
+
+logger = logging.getLogger(__name__)
+
+# Give up on a feed if the server doesn't respond for this many seconds
+FETCH_TIMEOUT = 30
+MAX_CONCURRENT_FETCHES = 4
+
+ACCEPT_HEADER = (
+    "application/rss+xml,application/atom+xml,application/xml;q=0.9,*/*;q=0.1"
+)
+HTTP_NOT_MODIFIED = 304
+
+
+class _RecordRedirects(HTTPRedirectHandler):
+    def __init__(self):
+        self.codes: list[int] = []
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):  # noqa: PLR0913
+        self.codes.append(code)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def fetch(
+    url: str,
+    etag: str | None = None,
+    modified: str | None = None,
+    timeout: float = FETCH_TIMEOUT,
+) -> FeedParserDict:
+    """Fetch and parse a feed, like `feedparser.parse(url, etag, modified)`.
+
+    The result has the same `status`, `href`, `etag` and `modified` that
+    feedparser would give it. If the server couldn't be reached, `status` is
+    None.
+    """
+    request = Request(
+        url, headers={"User-Agent": feedparser.USER_AGENT, "Accept": ACCEPT_HEADER}
+    )
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if modified:
+        request.add_header("If-Modified-Since", modified)
+
+    redirects = _RecordRedirects()
+    try:
+        with build_opener(redirects).open(request, timeout=timeout) as response:
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            feed = feedparser.parse(response.read(), response_headers=headers)
+            status = response.status
+            href = response.url
+    except HTTPError as e:
+        # Including 304 Not Modified
+        return FeedParserDict(
+            status=e.code, href=url, entries=[], bozo=e.code != HTTP_NOT_MODIFIED
+        )
+    except (URLError, TimeoutError) as e:
+        return FeedParserDict(
+            status=None, href=url, entries=[], bozo=True, bozo_exception=e
+        )
+
+    # feedparser reports the first redirect, so that permanent moves are noticed
+    feed["status"] = redirects.codes[0] if redirects.codes else status
+    feed["href"] = href
+    if headers.get("etag"):
+        feed["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        feed["modified"] = headers["last-modified"]
+    return feed
+
+
+def update_cache(
+    cache: MutableMapping[str, Any],
+    url: str,
+    new_feed: FeedParserDict,
+    cached_feed: FeedParserDict | None,
+) -> FeedParserDict | None:
+    """Store a freshly fetched feed, returning the best version of it available.
+
+    `cached_feed` is the feed already in the cache, passed in so that the cache
+    is only read once.
+    """
+    match new_feed.status:
+        case 200 | 302:
+            cache[url] = new_feed
+            return new_feed
+        case 304 if cached_feed is not None:
+            # the feed has not been modified
+            return cached_feed
+        case 301:
+            logger.warning(
+                "HTTP response 301: %s has permanently moved to %s",
+                url,
+                new_feed.href,
+            )
+            cache[url] = new_feed
+            return new_feed
+        case _ if cached_feed is None:
+            logger.warning(
+                "Something went wrong fetching %s (status %s). Cannot scrape metadata",
+                url,
+                new_feed.status,
+            )
+            return None
+        case _:
+            logger.warning(
+                "Something went wrong fetching %s (status %s). Using cached feed.",
+                url,
+                new_feed.status,
+            )
+            return cached_feed
+
+
+async def fetch_feeds(
+    urls: Iterable[str],
+    cache: MutableMapping[str, Any],
+    timeout: float = FETCH_TIMEOUT,
+    max_concurrent: int = MAX_CONCURRENT_FETCHES,
+) -> dict[str, FeedParserDict | None]:
+    """Fetch feeds concurrently, revalidating any which are already cached.
+
+    Args:
+        urls: the feeds to fetch
+        cache: maps each URL to the last good version of its feed
+        timeout: how long to wait for each server, in seconds
+        max_concurrent: the most feeds to fetch at the same time
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def revalidate(url: str) -> FeedParserDict | None:
+        cached_feed = cache.get(url)
+        etag = modified = None
+        if cached_feed is not None:
+            etag, modified = cached_feed.get("etag"), cached_feed.get("modified")
+        async with semaphore:
+            new_feed = await asyncio.to_thread(fetch, url, etag, modified, timeout)
+        return update_cache(cache, url, new_feed, cached_feed)
+
+    urls = list(dict.fromkeys(urls))
+    feeds = await asyncio.gather(*map(revalidate, urls))
+    return dict(zip(urls, feeds, strict=True))
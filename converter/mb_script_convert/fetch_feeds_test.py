@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from .fetch_feeds import fetch, fetch_feeds
+
+FEED = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>%s</title>
+<item><title>Chapter 1: The Transdimensional Haboob</title></item>
+</channel></rss>
+"""
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Serves a feed at /<name>, with an ETag, and records the requests."""
+
+    # Wait for the requests to finish on closing, so no threads are left behind
+    daemon_threads = False
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.requests: list[tuple[str, str | None]] = []
+        self.delay = 0.0
+        self.active = 0
+        self.most_active = 0
+        self.lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    server: FeedServer
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            server.active += 1
+            server.most_active = max(server.most_active, server.active)
+        try:
+            time.sleep(server.delay)
+            self._respond()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _respond(self):
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/main")
+            self.end_headers()
+        elif self.path == "/missing":
+            self.send_error(404)
+        elif self.headers.get("If-None-Match") == f'"{self.path}"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            body = FEED % self.path.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("ETag", f'"{self.path}"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[FeedServer]:
+    server = FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch(server: FeedServer):
+    feed = fetch(server.url("/main"))
+    assert feed.status == 200  # noqa: PLR2004
+    assert feed.etag == '"/main"'
+    assert feed.feed.title == "/main"
+    assert [entry.title for entry in feed.entries] == [
+        "Chapter 1: The Transdimensional Haboob"
+    ]
+
+    assert fetch(server.url("/main"), etag=feed.etag).status == 304  # noqa: PLR2004
+    moved = fetch(server.url("/moved"))
+    assert moved.status == 301  # noqa: PLR2004
+    assert moved.href == server.url("/main")
+    assert fetch(server.url("/missing")).status == 404  # noqa: PLR2004
+
+
+def test_fetch_timeout(server: FeedServer):
+    server.delay = 0.5
+    feed = fetch(server.url("/main"), timeout=0.1)
+    assert feed.status is None
+    assert feed.bozo
+
+
+def test_fetch_feeds(server: FeedServer):
+    urls = [server.url(f"/feed{i}") for i in range(6)]
+    cache = {}
+    server.delay = 0.2
+
+    feeds = asyncio.run(fetch_feeds([*urls, urls[0]], cache, max_concurrent=3))
+
+    assert list(feeds) == urls
+    assert [feed.feed.title for feed in feeds.values()] == [
+        f"/feed{i}" for i in range(6)
+    ]
+    assert cache == feeds
+    assert server.most_active == 3  # noqa: PLR2004
+
+    # Cached feeds are revalidated, and kept if they haven't changed
+    server.requests.clear()
+    assert asyncio.run(fetch_feeds(urls, cache)) == feeds
+    assert sorted(server.requests) == sorted(
+        (f"/feed{i}", f'"/feed{i}"') for i in range(6)
+    )
+
+
+def test_fetch_feeds_failures(server: FeedServer, caplog: pytest.LogCaptureFixture):
+    cache = {}
+    main = server.url("/main")
+    asyncio.run(fetch_feeds([main], cache))
+
+    server.delay = 0.5
+    feeds = asyncio.run(fetch_feeds([main, server.url("/missing")], cache, timeout=0.1))
+
+    assert feeds == {main: cache[main], server.url("/missing"): None}
+    assert "Using cached feed" in caplog.text
+    assert "Cannot scrape metadata" in caplog.text
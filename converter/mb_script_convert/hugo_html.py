@@ -1,16 +1,21 @@
 import logging
+import re
 import tomllib
+from collections.abc import Iterable, Iterator
 from contextlib import nullcontext
+from functools import partial
+from html import escape
 from io import BytesIO
+from itertools import chain
 from pathlib import Path
-from typing import IO, Union
+from typing import IO, Any, Union
 
-import lxml.html.builder as b
 import tomli_w
 from adaptix import P, Retort, as_sentinel, name_mapping
-from lxml import html
+from adaptix.load_error import LoadError
+from lxml import etree
 
-from .transcript import Metadata, Transcript
+from .transcript import TAGS, Element, Metadata, PackedContent, Tag, Transcript
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +49,24 @@ def dump(transcript: Transcript, file_or_path: str | Path | IO[bytes]):
         tomli_w.dump(retort.dump(transcript.metadata), fh)
         fh.write(b"+++\n\n")
 
-        for el in transcript.content:
-            html_el = b.P(b.CLASS(el[0]), el[1])
-            html_el_str = html.tostring(html_el, pretty_print=True, encoding="utf-8")
-            assert isinstance(html_el_str, bytes)  # for type hinting
-            fh.write(html_el_str)
+        write_content(fh, transcript.content)
+
+
+# Characters which can't appear in an XML (or lxml) document
+XML_INCOMPATIBLE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def write_content(fh: IO[bytes], content: Iterable[Element]):
+    """Write each element of the content as a paragraph with the tag as its class.
+
+    The content is written as it is iterated, so it can be a generator. The
+    output matches what lxml would serialise for the same paragraphs.
+    """
+    for tag, text in content:
+        if XML_INCOMPATIBLE.search(text):
+            msg = f"Text contains characters not allowed in HTML: {text!r}"
+            raise ValueError(msg)
+        fh.write(f'<p class="{tag}">{escape(text, quote=False)}</p>\n'.encode())
 
 
 def dumps(transcript: Transcript) -> str:
@@ -57,19 +75,156 @@ def dumps(transcript: Transcript) -> str:
     return out.getvalue().decode("utf-8")
 
 
-def load_metadata(file_or_path: str | Path | IO[str], transcript: Transcript):
+# No frontmatter should be anywhere near this long, so if the closing +++ hasn't
+# been found by then the file is malformed
+MAX_FRONTMATTER_SIZE = 64 * 1024
+# The +++ lines around the frontmatter, with either line ending
+FRONTMATTER_START = re.compile(rb"\+\+\+\r?\n")
+FRONTMATTER_END = re.compile(rb"\n\+\+\+\r?\n")
+
+
+class InvalidFrontmatterError(Exception):
+    pass
+
+
+def read_frontmatter(file_or_path: str | Path | IO[str] | IO[bytes]) -> dict[str, Any]:
+    """Read and parse the TOML frontmatter at the start of a Hugo document.
+
+    Only the start of the file is read, in one bounded read.
+
+    Raises:
+        InvalidFrontmatterError: if the file doesn't start with frontmatter
+            delimited by +++ lines, or the frontmatter isn't valid TOML
+
+    """
+    if isinstance(file_or_path, (str, Path)):
+        name = str(file_or_path)
+        with Path(file_or_path).open("rb") as fh:
+            head = fh.read(MAX_FRONTMATTER_SIZE)
+    else:
+        name = getattr(file_or_path, "name", repr(file_or_path))
+        head = file_or_path.read(MAX_FRONTMATTER_SIZE)
+    if isinstance(head, str):
+        head = head.encode("utf-8")
+
+    return _split_frontmatter(head, name)[0]
+
+
+def _split_frontmatter(head: bytes, name: str) -> tuple[dict[str, Any], int]:
+    """Parse the frontmatter in `head`, and find where the content starts."""
+    start = FRONTMATTER_START.match(head)
+    if start is None:
+        msg = f"{name} is not a valid Hugo document"
+        raise InvalidFrontmatterError(msg)
+    # The newline ending the opening +++ also starts an empty frontmatter's end
+    end = FRONTMATTER_END.search(head, start.end() - 1)
+    if end is None:
+        msg = f"No closing +++ in the first {MAX_FRONTMATTER_SIZE} bytes of {name}"
+        raise InvalidFrontmatterError(msg)
+
+    try:
+        frontmatter = tomllib.loads(head[start.end() : end.start() + 1].decode("utf-8"))
+    except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+        msg = f"Invalid frontmatter in {name}: {e}"
+        raise InvalidFrontmatterError(msg) from e
+    return frontmatter, end.end()
+
+
+def load_metadata(
+    file_or_path: str | Path | IO[str] | IO[bytes], transcript: Transcript
+):
+    frontmatter = read_frontmatter(file_or_path)
+    transcript.metadata = retort.load(frontmatter, Metadata)
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class InvalidContentError(Exception):
+    pass
+
+
+def read_content(chunks: Iterable[bytes]) -> Iterator[Element]:
+    """Parse the paragraphs written by `write_content`, as the chunks arrive.
+
+    lxml parses the HTML, but calls back to a `_ParagraphReader` instead of
+    building a tree, so the document is never held in memory as a whole.
+
+    Raises:
+        InvalidContentError: if a paragraph's class isn't a known tag
+
+    """
+    reader = _ParagraphReader()
+    parser = etree.HTMLParser(target=reader, encoding="utf-8")
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from reader.paragraphs
+        reader.paragraphs.clear()
+    parser.close()
+    yield from reader.paragraphs
+
+
+class _ParagraphReader:
+    """An lxml parser target which collects the text and class of each paragraph."""
+
+    def __init__(self):
+        self.paragraphs: list[Element] = []
+        self._tag: Tag | None = None
+        self._text: list[str] = []
+
+    def start(self, tag: str, attrib: dict[str, str]):
+        if tag != "p":
+            return
+        cls = attrib.get("class")
+        if cls not in TAGS:
+            msg = f"Unknown paragraph class {cls!r}"
+            raise InvalidContentError(msg)
+        self._tag = cls
+        self._text = []
+
+    def data(self, data: str):
+        if self._tag is not None:
+            self._text.append(data)
+
+    def end(self, tag: str):
+        if tag == "p" and self._tag is not None:
+            self.paragraphs.append((self._tag, "".join(self._text)))
+            self._tag = None
+
+    def close(self):
+        pass
+
+
+def load(file_or_path: str | Path | IO[bytes], pack: bool = False) -> Transcript:
+    """Read a transcript written by `dump`.
+
+    With `pack`, the content is read straight into a `PackedContent`.
+
+    Raises:
+        InvalidFrontmatterError: if the frontmatter can't be read
+        InvalidContentError: if the content can't be read
+
+    """
     if isinstance(file_or_path, (str, Path)):
         path = Path(file_or_path)
-        assert path.exists(), "Invalid path passed"
-        file = path.open("r", encoding="utf-8")
+        name = str(path)
+        file = path.open("rb")
     else:
+        name = getattr(file_or_path, "name", repr(file_or_path))
         file = nullcontext(file_or_path)
     with file as fh:
-        if fh.readline() != "+++\n":
-            logger.warning("Existing output file is not a valid Hugo document")
-        frontmatter_str = ""
-        while (line := fh.readline()) != "+++\n":
-            frontmatter_str += line
+        head = fh.read(MAX_FRONTMATTER_SIZE)
+        frontmatter, start = _split_frontmatter(head, name)
+        chunks = chain([head[start:]], iter(partial(fh.read, CHUNK_SIZE), b""))
+        elements = read_content(chunks)
+        content = PackedContent(elements) if pack else list(elements)
+    return Transcript(retort.load(frontmatter, Metadata), content)
 
-    frontmatter = tomllib.loads(frontmatter_str)
-    transcript.metadata = retort.load(frontmatter, Metadata)
+
+def load_tree(root: Path, pack: bool = False) -> Iterator[tuple[Path, Transcript]]:
+    """Read every transcript under `root`, skipping any which are invalid."""
+    for path in sorted(root.glob("**/*.html")):
+        try:
+            yield path, load(path, pack)
+        except (InvalidFrontmatterError, InvalidContentError, LoadError) as e:
+            logger.warning("Not loading %s: %s", path, e)
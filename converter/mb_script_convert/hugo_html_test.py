@@ -1,10 +1,26 @@
 from datetime import datetime
+from io import BytesIO, StringIO
 from pathlib import Path
 
+import lxml.html.builder as b
 import pytest
+from lxml import html
 
-from mb_script_convert.hugo_html import dump, dumps, load_metadata
-from mb_script_convert.transcript import Metadata, Transcript
+from mb_script_convert.hugo_html import (
+    CHUNK_SIZE,
+    MAX_FRONTMATTER_SIZE,
+    InvalidContentError,
+    InvalidFrontmatterError,
+    dump,
+    dumps,
+    load,
+    load_metadata,
+    load_tree,
+    read_content,
+    read_frontmatter,
+    write_content,
+)
+from mb_script_convert.transcript import Metadata, PackedContent, Transcript
 
 
 @pytest.fixture
@@ -51,3 +67,138 @@ def test_load_metadata(transcript, tmp_path: Path):
     load_metadata(existing_transcript, new_transcript)
 
     assert new_transcript.metadata == transcript.metadata
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "a & b < c > d",
+        "\"quoted\" 'text'",
+        "&amp; is already escaped",
+        "curly ’ “quotes” and café",
+        "tab\tand\r\nnewline",
+        "\xa0non-breaking",
+        "emoji 😀",
+    ],
+)
+def test_write_content_matches_lxml(text: str):
+    out = BytesIO()
+    write_content(out, iter([("dialogue", text)]))
+
+    expected = html.tostring(
+        b.P(b.CLASS("dialogue"), text), pretty_print=True, encoding="utf-8"
+    )
+    assert out.getvalue() == expected
+
+
+def test_write_content_rejects_control_characters():
+    with pytest.raises(ValueError, match="not allowed"):
+        write_content(BytesIO(), [("dialogue", "form\x0cfeed")])
+
+
+def test_load_metadata_from_file_object(transcript):
+    text = dumps(transcript)
+
+    from_str = Transcript()
+    load_metadata(StringIO(text), from_str)
+    from_bytes = Transcript()
+    load_metadata(BytesIO(text.encode()), from_bytes)
+
+    assert from_str.metadata == transcript.metadata
+    assert from_bytes.metadata == transcript.metadata
+
+
+def test_read_frontmatter_ignores_body(transcript):
+    text = dumps(transcript) + "+++\n" + "x" * (2 * MAX_FRONTMATTER_SIZE)
+
+    assert read_frontmatter(StringIO(text))["title"] == "Panopticon"
+
+
+def test_read_frontmatter_empty():
+    assert read_frontmatter(StringIO("+++\n+++\n")) == {}
+    assert read_frontmatter(BytesIO(b"+++\r\n+++\r\n")) == {}
+
+
+def test_load_crlf(transcript, tmp_path: Path):
+    path = tmp_path / "test.html"
+    path.write_bytes(dumps(transcript).replace("\n", "\r\n").encode())
+
+    assert read_frontmatter(path) == read_frontmatter(StringIO(dumps(transcript)))
+    loaded = load(path)
+    assert loaded.metadata == transcript.metadata
+    assert loaded.content == transcript.content
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "<p>no frontmatter</p>\n",
+        "+++\ntitle = 'Unclosed'\n",
+        "+++\n" + "# padding\n" * MAX_FRONTMATTER_SIZE + "+++\n",
+        "+++\ntitle = \n+++\n",
+    ],
+)
+def test_read_frontmatter_invalid(text: str):
+    with pytest.raises(InvalidFrontmatterError):
+        read_frontmatter(StringIO(text))
+
+
+def test_load_round_trip(transcript, tmp_path: Path):
+    path = tmp_path / "test.html"
+    dump(transcript, path)
+
+    loaded = load(path)
+
+    assert loaded.metadata == transcript.metadata
+    assert loaded.content == transcript.content
+    assert dumps(loaded) == path.read_text(encoding="utf-8")
+
+
+def test_load_long_content(transcript):
+    # Long enough to be read in several chunks, with paragraphs split across them
+    transcript.content = [
+        ("dialogue", f"Line {i} & “more” <text>") for i in range(CHUNK_SIZE // 10)
+    ]
+
+    loaded = load(BytesIO(dumps(transcript).encode()))
+
+    assert loaded.content == transcript.content
+
+
+def test_read_content_across_chunks():
+    chunks = [b'<p class="dialogue">caf', b"\xc3", b"\xa9 &am", b"p; bar</p>\n"]
+
+    assert list(read_content(chunks)) == [("dialogue", "café & bar")]
+
+
+def test_read_content_unknown_class():
+    with pytest.raises(InvalidContentError, match="'chorus'"):
+        list(read_content([b'<p class="chorus">la la la</p>\n']))
+
+
+def test_load_tree(transcript, tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    dump(transcript, tmp_path / "season-1" / "chapter-1.html")
+    dump(transcript, tmp_path / "season-1" / "chapter-2" / "index.html")
+    (tmp_path / "broken.html").write_text("<p>no frontmatter</p>\n")
+
+    loaded = list(load_tree(tmp_path))
+
+    assert [path.relative_to(tmp_path).as_posix() for path, _ in loaded] == [
+        "season-1/chapter-1.html",
+        "season-1/chapter-2/index.html",
+    ]
+    assert all(doc.content == transcript.content for _, doc in loaded)
+    assert "Not loading" in caplog.text
+
+
+def test_load_packed(transcript, tmp_path: Path):
+    path = tmp_path / "test.html"
+    dump(transcript, path)
+
+    loaded = load(path, pack=True)
+
+    assert isinstance(loaded.content, PackedContent)
+    assert loaded.content == transcript.content
+    assert dumps(loaded) == path.read_text(encoding="utf-8")
@@ -1,19 +1,23 @@
 import logging
 import re
 
-from py_pdf_parser.exceptions import ElementOutOfRangeError, NoElementFoundError
-from py_pdf_parser.loaders import PDFDocument, load_file
+import numpy as np
+from py_pdf_parser.components import PDFElement
+from py_pdf_parser.exceptions import NoElementFoundError
+from py_pdf_parser.filtering import ElementList
+from py_pdf_parser.loaders import PDFDocument
 from titlecase import titlecase
 
 from mb_script_convert.pdf_utils import (
-    by_indent,
+    ElementArrays,
     by_min_indent,
     clean_text,
     is_centered,
-    is_in_top_right,
-    is_off_page,
 )
 
+from .element_cache import load_cached_pdf
+from .instrumentation import stage
+from .pdf_layout import LoadProfile, load_pdf
 from .transcript import Transcript
 from .transcript_utils import combine_more, extract_parentheticals, split_short_dialogue
 
@@ -22,17 +26,32 @@ logger = logging.getLogger(__name__)
 DIRECTIONS_INDENT = 108.0
 DIALOGUE_INDENT = 144.0
 MAX_TITLE_PAGE_LEN = 5
-
-
-def import_transcript(pdf_file: str, debug: bool) -> Transcript:
-    pdf = load_file(pdf_file)
-    tag_pdf(pdf)
+PAGE_NUMBER = re.compile(r"\d+\.")
+
+
+def import_transcript(
+    pdf_file: str,
+    debug: bool,
+    load_profile: LoadProfile = "pdfminer",
+    element_cache: bool = False,
+) -> Transcript:
+    with stage("load_file"):
+        if element_cache:
+            pdf = load_cached_pdf(pdf_file, load_profile)
+        else:
+            pdf = load_pdf(pdf_file, load_profile)
+    with stage("tag_pdf"):
+        tag_pdf(pdf)
     if debug:
         _visualise(pdf)
-    transcript = tagged_pdf_to_transcript(pdf)
-    split_short_dialogue(transcript)
-    extract_parentheticals(transcript)
-    combine_more(transcript)
+    with stage("tagged_pdf_to_transcript"):
+        transcript = tagged_pdf_to_transcript(pdf)
+    with stage("split_short_dialogue"):
+        split_short_dialogue(transcript)
+    with stage("extract_parentheticals"):
+        extract_parentheticals(transcript)
+    with stage("combine_more"):
+        combine_more(transcript)
     return transcript
 
 
@@ -43,14 +62,12 @@ def _visualise(pdf: PDFDocument):
 
 
 def tag_pdf(pdf: PDFDocument):
-    # Ignore elements off of the page
-    pdf.elements.filter(is_off_page).ignore_elements()
+    # Measure every element up front, so the geometric tests can be run on all
+    # of them at once
+    arrays = ElementArrays(pdf.elements)
 
-    # Ignore page numbers
-    page_numbers = pdf.elements.filter_by_regex(r"\d+\.").filter(is_in_top_right)
-    if len(page_numbers) == 0:
-        logger.warning("Could not find page numbers.")
-    page_numbers.ignore_elements()
+    # Ignore elements off of the page, and page numbers
+    _element_list(pdf, arrays.select(_find_page_furniture(arrays))).ignore_elements()
 
     # Detect and ignore title page
     first_page = pdf.get_page(1).elements
@@ -80,33 +97,50 @@ def tag_pdf(pdf: PDFDocument):
         logger.warning("Could not find THE END or equivalent")
 
     # Rest of the script
-    script = pdf.elements - pdf.elements.filter_by_tags(
-        "series_title", "episode_title", "end"
+    in_script = np.array(
+        [not el.ignored and len(el.tags) == 0 for el in arrays.elements], dtype=bool
     )
+    is_direction = in_script & arrays.by_indent(DIRECTIONS_INDENT)
+    is_dialogue = in_script & arrays.by_indent(DIALOGUE_INDENT)
 
-    directions = script.filter(by_indent(DIRECTIONS_INDENT))
-    dialogue = script.filter(by_indent(DIALOGUE_INDENT))
+    # A direction immediately followed by dialogue is actually a character name.
+    # Compare each element of the script with the next one in a single sweep.
+    script = np.flatnonzero(is_direction | is_dialogue)
+    followed_by_dialogue = np.zeros_like(is_direction)
+    followed_by_dialogue[script[:-1]] = is_dialogue[script[1:]]
+    is_character = is_direction & followed_by_dialogue
 
-    directions.add_tag_to_elements("direction/character")
-    dialogue.add_tag_to_elements("dialogue")
-
-    others = script - script.filter_by_tags("direction/character", "dialogue")
+    others = arrays.select(in_script & ~is_direction & ~is_dialogue)
     if len(others) > 0:
         logger.warning("Found text that has not been categorised:")
         for el in others:
             logger.warning("%s %s", repr(el.text()), repr(el.bounding_box))
 
-    script = directions | dialogue
-
-    for el in directions:
-        try:
-            next_ = script.move_forwards_from(el)
-        except ElementOutOfRangeError:
-            next_ = None
-        if next_ is not None and "dialogue" in next_.tags:
-            el.tags = {"character"}
+    for i in script:
+        el = arrays.elements[i]
+        if is_character[i]:
+            el.add_tag("character")
+        elif is_direction[i]:
+            el.add_tag("direction")
         else:
-            el.tags = {"direction"}
+            el.add_tag("dialogue")
+
+
+def _find_page_furniture(arrays: ElementArrays) -> np.ndarray:
+    off_page = arrays.is_off_page()
+
+    page_numbers = np.zeros_like(off_page)
+    for i in np.flatnonzero(~off_page & arrays.is_in_top_right()):
+        page_numbers[i] = PAGE_NUMBER.match(arrays.elements[i].text()) is not None
+    if not page_numbers.any():
+        logger.warning("Could not find page numbers.")
+
+    return off_page | page_numbers
+
+
+def _element_list(pdf: PDFDocument, elements: list[PDFElement]) -> ElementList:
+    selected = set(elements)
+    return pdf.elements.filter(selected.__contains__)
 
 
 def tagged_pdf_to_transcript(tagged: PDFDocument) -> Transcript:
@@ -0,0 +1,166 @@
+import random
+import re
+
+import pytest
+from py_pdf_parser.components import PDFDocument
+from py_pdf_parser.exceptions import ElementOutOfRangeError, NoElementFoundError
+
+from .conftest import CHAR_WIDTH, PAGE_HEIGHT, PAGE_WIDTH, MakeDocument
+from .import_midnight_burger import (
+    DIALOGUE_INDENT,
+    DIRECTIONS_INDENT,
+    MAX_TITLE_PAGE_LEN,
+    tag_pdf,
+)
+from .pdf_utils import (
+    by_indent,
+    by_min_indent,
+    is_centered,
+    is_in_top_right,
+    is_off_page,
+)
+
+
+def _centered(y0: float, text: str) -> tuple[float, float, str]:
+    return (PAGE_WIDTH / 2 - CHAR_WIDTH * len(text) / 2, y0, text)
+
+
+@pytest.fixture
+def script(make_document: MakeDocument) -> PDFDocument:
+    return make_document(
+        {
+            1: [
+                _centered(500, "MIDNIGHT BURGER"),
+                _centered(480, "Chapter 1: The Transdimensional Haboob"),
+            ],
+            2: [
+                (520, 750, "2."),
+                (DIRECTIONS_INDENT, 700, "MIDNIGHT BURGER:"),
+                (DIRECTIONS_INDENT, 680, "Chapter 1: The Transdimensional Haboob."),
+                (DIRECTIONS_INDENT, 640, "A BELL RINGS AS THE DOOR OPENS."),
+                (DIRECTIONS_INDENT, 600, "CLEMENTINE"),
+                (DIALOGUE_INDENT, 580, "Welcome to Midnight Burger!"),
+                (DIRECTIONS_INDENT + 5, 540, "BUD"),
+                (DIALOGUE_INDENT - 5, 520, "(grumbling)\nHey."),
+                (DIRECTIONS_INDENT, 480, "(MORE)"),
+                (DIRECTIONS_INDENT, PAGE_HEIGHT + 50, "off the page"),
+            ],
+            3: [
+                (520, 750, "3."),
+                (DIRECTIONS_INDENT, 700, "BUD (CONT'D)"),
+                (DIALOGUE_INDENT, 680, "Nice night."),
+                (300, 640, "uncategorised"),
+                (DIRECTIONS_INDENT, 600, "THE DINER FADES AWAY."),
+                (DIALOGUE_INDENT + 60, 560, "THE END"),
+            ],
+        }
+    )
+
+
+def _tags(pdf: PDFDocument) -> list[tuple[str, set[str]]]:
+    return [(el.text(), el.tags) for el in pdf.elements]
+
+
+def test_tag_pdf(script: PDFDocument):
+    tag_pdf(script)
+
+    assert _tags(script) == [
+        ("MIDNIGHT BURGER:", {"series_title"}),
+        ("Chapter 1: The Transdimensional Haboob.", {"episode_title"}),
+        ("A BELL RINGS AS THE DOOR OPENS.", {"direction"}),
+        ("CLEMENTINE", {"character"}),
+        ("Welcome to Midnight Burger!", {"dialogue"}),
+        ("BUD", {"character"}),
+        ("(grumbling)\nHey.", {"dialogue"}),
+        ("(MORE)", {"direction"}),
+        ("BUD (CONT'D)", {"character"}),
+        ("Nice night.", {"dialogue"}),
+        ("uncategorised", set()),
+        ("THE DINER FADES AWAY.", {"direction"}),
+        ("THE END", {"end"}),
+    ]
+
+
+def _reference_tag_pdf(pdf: PDFDocument):
+    """Tag the PDF using the original implementation of tag_pdf."""
+    pdf.elements.filter(is_off_page).ignore_elements()
+
+    page_numbers = pdf.elements.filter_by_regex(r"\d+\.").filter(is_in_top_right)
+    page_numbers.ignore_elements()
+
+    first_page = pdf.get_page(1).elements
+    if (
+        all(is_centered(el) for el in first_page)
+        and len(first_page) <= MAX_TITLE_PAGE_LEN
+    ):
+        first_page.ignore_elements()
+        first_page = pdf.elements.filter_by_page(2)
+
+    first_page[0].add_tag("series_title")
+    first_page[1].add_tag("episode_title")
+
+    last_page = pdf.pages[-1].elements
+    try:
+        end = (
+            last_page.filter_by_regex(r".*\bend\b.*", re.IGNORECASE)
+            .filter(by_min_indent(DIALOGUE_INDENT + 10))
+            .last()
+        )
+        end.add_tag("end")
+    except NoElementFoundError:
+        pass
+
+    script = pdf.elements - pdf.elements.filter_by_tags(
+        "series_title", "episode_title", "end"
+    )
+
+    directions = script.filter(by_indent(DIRECTIONS_INDENT))
+    dialogue = script.filter(by_indent(DIALOGUE_INDENT))
+
+    directions.add_tag_to_elements("direction/character")
+    dialogue.add_tag_to_elements("dialogue")
+
+    script = directions | dialogue
+
+    for el in directions:
+        try:
+            next_ = script.move_forwards_from(el)
+        except ElementOutOfRangeError:
+            next_ = None
+        if next_ is not None and "dialogue" in next_.tags:
+            el.tags = {"character"}
+        else:
+            el.tags = {"direction"}
+
+
+def _random_script(pages: int) -> dict[int, list[tuple[float, float, str]]]:
+    rng = random.Random(pages)
+    script = {
+        1: [_centered(500, "MIDNIGHT BURGER"), _centered(480, "Chapter 99: Test")],
+        2: [
+            (DIRECTIONS_INDENT, 700, "MIDNIGHT BURGER:"),
+            (DIRECTIONS_INDENT, 680, "Chapter 99: Test."),
+        ],
+    }
+    for page in range(2, pages + 1):
+        elements = script.setdefault(page, [])
+        elements.append((520, 750, f"{page}."))
+        for y0 in range(640, 80, -30):
+            indent = rng.choice(
+                [DIRECTIONS_INDENT, DIALOGUE_INDENT, DIALOGUE_INDENT, 300]
+            )
+            elements.append((indent + rng.uniform(-8, 8), y0, f"line {page} {y0}"))
+    script[pages].append((DIALOGUE_INDENT + 60, 40, "THE END"))
+    return script
+
+
+@pytest.mark.parametrize("pages", [3, 30])
+def test_tag_pdf_matches_reference(make_document: MakeDocument, pages: int):
+    pdf = make_document(_random_script(pages))
+    reference_pdf = make_document(_random_script(pages))
+
+    tag_pdf(pdf)
+    _reference_tag_pdf(reference_pdf)
+
+    assert _tags(pdf) == _tags(reference_pdf)
+    assert {"character"} in [tags for _, tags in _tags(pdf)]
@@ -0,0 +1,147 @@
+"""Opt-in timing of the stages of each conversion.
+
+Stages are marked with `stage`, which does nothing unless a `FileProfile` is
+being recorded with `recording`. That keeps the instrumentation out of the way
+of the code it measures: nothing needs to be passed down to record a span.
+"""
+
+import json
+import logging
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def max_rss_kib() -> int | None:
+    """Get the peak resident set size of this process so far, in KiB."""
+    if resource is None:
+        return None
+    # Linux reports this in KiB, and macOS in bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _rss_growth(start: int | None) -> int | None:
+    end = max_rss_kib()
+    return None if start is None or end is None else end - start
+
+
+@dataclass
+class Span:
+    stage: str
+    wall: float
+    cpu: float
+    # How far the stage raised the peak RSS of the process. Memory is only
+    # counted once it exceeds the peak of any earlier stage or file, so this is
+    # a lower bound on what the stage used.
+    rss_growth_kib: int | None
+
+
+@dataclass
+class FileProfile:
+    inp: str
+    spans: list[Span] = field(default_factory=list)
+    wall: float = 0.0
+    cpu: float = 0.0
+    # How far converting the file raised the peak RSS, as for `Span`
+    rss_growth_kib: int | None = None
+    # The peak RSS of the whole process once the file was converted
+    process_peak_rss_kib: int | None = None
+
+
+_current: FileProfile | None = None
+
+
+@contextmanager
+def _measure() -> Iterator[list[float]]:
+    """Yield a list which is filled with the wall and CPU time of the block.
+
+    The list ends with how far the block raised the process's peak RSS.
+    """
+    measurements: list = []
+    rss_start = max_rss_kib()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield measurements
+    finally:
+        measurements.extend(
+            [
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                _rss_growth(rss_start),
+            ]
+        )
+
+
+@contextmanager
+def recording(profile: FileProfile | None) -> Iterator[None]:
+    """Record the stages run inside the block into `profile`, if it isn't None."""
+    global _current  # noqa: PLW0603
+    if profile is None:
+        yield
+        return
+    _current = profile
+    try:
+        with _measure() as measurements:
+            yield
+    finally:
+        _current = None
+        profile.wall, profile.cpu, profile.rss_growth_kib = measurements
+        profile.process_peak_rss_kib = max_rss_kib()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as the stage `name` of the file being recorded."""
+    profile = _current
+    if profile is None:
+        yield
+        return
+    try:
+        with _measure() as measurements:
+            yield
+    finally:
+        profile.spans.append(Span(name, *measurements))
+
+
+def write_report(report_file: Path, profiles: Iterable[FileProfile]):
+    """Write one line of JSON for each file."""
+    with report_file.open("w", encoding="utf-8") as f:
+        for profile in profiles:
+            f.write(json.dumps(asdict(profile)) + "\n")
+
+
+def log_summary(profiles: list[FileProfile]):
+    """Log a table of the time spent in each stage, over all the files."""
+    totals: dict[str, list[float]] = {}
+    for profile in profiles:
+        for span in profile.spans:
+            total = totals.setdefault(span.stage, [0.0, 0.0])
+            total[0] += span.wall
+            total[1] += span.cpu
+    wall = sum(profile.wall for profile in profiles)
+    cpu = sum(profile.cpu for profile in profiles)
+    peak = max((profile.process_peak_rss_kib or 0 for profile in profiles), default=0)
+
+    logger.info("%-26s %10s %10s %6s", "Stage", "Wall (s)", "CPU (s)", "Wall %")
+    for name, (stage_wall, stage_cpu) in totals.items():
+        logger.info(
+            "%-26s %10.3f %10.3f %5.1f%%",
+            name,
+            stage_wall,
+            stage_cpu,
+            100 * stage_wall / wall if wall else 0,
+        )
+    logger.info("%-26s %10.3f %10.3f", f"Total ({len(profiles)} files)", wall, cpu)
+    logger.info("Peak RSS: %.1f MiB", peak / 1024)
@@ -0,0 +1,79 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from . import instrumentation
+from .instrumentation import FileProfile, log_summary, recording, stage, write_report
+
+
+def test_stage_does_nothing_unless_recording():
+    with stage("unrecorded"):
+        pass
+
+    profile = FileProfile("a.pdf")
+    with recording(profile), stage("recorded"):
+        pass
+    with stage("after"):
+        pass
+
+    assert [span.stage for span in profile.spans] == ["recorded"]
+    assert profile.wall >= profile.spans[0].wall
+
+
+def _fail(profile: FileProfile):
+    with recording(profile), stage("failing"):
+        msg = "failed"
+        raise ValueError(msg)
+
+
+def test_recording_survives_errors():
+    profile = FileProfile("a.pdf")
+    with pytest.raises(ValueError, match="failed"):
+        _fail(profile)
+
+    assert [span.stage for span in profile.spans] == ["failing"]
+    with stage("after"):
+        pass
+    assert len(profile.spans) == 1
+
+
+def test_report(tmp_path: Path, caplog: pytest.LogCaptureFixture):
+    profiles = []
+    for name in ("a.pdf", "b.pdf"):
+        profile = FileProfile(name)
+        with recording(profile):
+            for stage_name in ("load_file", "dump"):
+                with stage(stage_name):
+                    pass
+        profiles.append(profile)
+
+    report_file = tmp_path / "report.jsonl"
+    write_report(report_file, profiles)
+    with caplog.at_level(logging.INFO):
+        log_summary(profiles)
+
+    lines = [json.loads(line) for line in report_file.read_text().splitlines()]
+    assert [line["inp"] for line in lines] == ["a.pdf", "b.pdf"]
+    assert [span["stage"] for span in lines[0]["spans"]] == ["load_file", "dump"]
+    assert set(lines[0]["spans"][0]) == {"stage", "wall", "cpu", "rss_growth_kib"}
+    rows = [record.getMessage().split()[0] for record in caplog.records]
+    assert rows == ["Stage", "load_file", "dump", "Total", "Peak"]
+
+
+def test_rss_growth(monkeypatch: pytest.MonkeyPatch):
+    # The peak RSS as each measurement reads it
+    peaks = iter([100, 100, 100, 100, 160, 160, 160])
+    monkeypatch.setattr(instrumentation, "max_rss_kib", lambda: next(peaks))
+
+    profile = FileProfile("a.pdf")
+    with recording(profile):
+        with stage("small"):
+            pass
+        with stage("large"):
+            pass
+
+    assert [span.rss_growth_kib for span in profile.spans] == [0, 60]
+    assert profile.rss_growth_kib == 60  # noqa: PLR2004
+    assert profile.process_peak_rss_kib == 160  # noqa: PLR2004
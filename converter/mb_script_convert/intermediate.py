@@ -0,0 +1,127 @@
+"""A binary file format for transcripts, as they are imported from a PDF.
+
+Saving a transcript before it is normalised means the normalisation and output
+can be run again without parsing the PDF. The file holds a `PackedContent` as
+it is laid out in memory, so loading one reads the file and wraps its buffers
+rather than building a tuple per element. The buffers are checked once as they
+are loaded, and the text of each element is decoded again when it is used.
+
+The layout is, with every integer little-endian:
+
+- a header of the magic bytes, the format version, the length of the metadata,
+  the number of elements and the length of the text
+- the metadata, as JSON
+- one byte per element for its tag, padded to a multiple of 8 bytes
+- an unsigned 64 bit integer per element, for the end of its text
+- the UTF-8 text of all of the elements
+"""
+
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from adaptix import Retort
+from adaptix.load_error import LoadError
+
+from .transcript import TAGS, Metadata, PackedContent, Transcript, padding
+
+SUFFIX = ".mbt"
+MAGIC = b"MBTR"
+VERSION = 1
+# magic, version, metadata length, number of elements, text length
+HEADER = struct.Struct("<4sHxxIQQ")
+END = struct.Struct("<Q")
+
+retort = Retort()
+
+
+class InvalidIntermediateError(Exception):
+    pass
+
+
+def _swap_if_big_endian(ends: memoryview) -> memoryview:
+    if sys.byteorder == "little":
+        return ends
+    swapped = array("Q", ends.tolist())
+    swapped.byteswap()
+    return memoryview(swapped)
+
+
+def dump_intermediate(transcript: Transcript, path: str | Path):
+    """Save a transcript, replacing the file at `path` atomically."""
+    path = Path(path)
+    content = transcript.content
+    if not isinstance(content, PackedContent):
+        content = PackedContent(content)
+    tags, ends, text = content.buffers()
+    ends = _swap_if_big_endian(ends)
+    metadata = json.dumps(retort.dump(transcript.metadata)).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix(".tmp")
+    with tmp_file.open("wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(metadata), len(tags), len(text)))
+        f.write(metadata)
+        f.write(bytes(padding(HEADER.size + len(metadata))))
+        f.write(tags)
+        f.write(bytes(padding(len(tags))))
+        f.write(ends)
+        f.write(text)
+    os.replace(tmp_file, path)
+
+
+def load_intermediate(path: str | Path) -> Transcript:
+    """Load a transcript saved by `dump_intermediate`.
+
+    The content is read in one go and wrapped, not copied into tuples.
+
+    Raises:
+        InvalidIntermediateError: if the file isn't a transcript in this version
+            of the format
+
+    """
+    # Transcripts are small enough that mapping the file gains nothing
+    data = memoryview(Path(path).read_bytes())
+    if len(data) < HEADER.size:
+        msg = f"{path} is too short to be a transcript"
+        raise InvalidIntermediateError(msg)
+
+    magic, version, metadata_len, count, text_len = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        msg = f"{path} is not a transcript"
+        raise InvalidIntermediateError(msg)
+    if version != VERSION:
+        msg = f"{path} is version {version} of the format, not {VERSION}"
+        raise InvalidIntermediateError(msg)
+
+    metadata_end = HEADER.size + metadata_len
+    tags_start = metadata_end + padding(metadata_end)
+    ends_start = tags_start + count + padding(count)
+    text_start = ends_start + END.size * count
+    if text_start + text_len != len(data):
+        msg = f"{path} is the wrong size for {count} elements"
+        raise InvalidIntermediateError(msg)
+
+    metadata = _load_metadata(data[HEADER.size : metadata_end], path)
+    tags = data[tags_start : tags_start + count]
+    if max(tags, default=0) >= len(TAGS):
+        msg = f"Unknown tag in {path}"
+        raise InvalidIntermediateError(msg)
+    ends = _swap_if_big_endian(data[ends_start:text_start].cast("Q"))
+    try:
+        content = PackedContent.from_buffers(tags, ends, data[text_start:])
+    except ValueError as e:
+        msg = f"Invalid content in {path}: {e}"
+        raise InvalidIntermediateError(msg) from e
+    return Transcript(metadata, content)
+
+
+def _load_metadata(data: memoryview, path: str | Path) -> Metadata:
+    try:
+        return retort.load(json.loads(bytes(data)), Metadata)
+    except (UnicodeDecodeError, json.JSONDecodeError, LoadError) as e:
+        msg = f"Invalid metadata in {path}: {e}"
+        raise InvalidIntermediateError(msg) from e
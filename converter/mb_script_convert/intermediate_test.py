@@ -0,0 +1,145 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from .hugo_html import dumps
+from .intermediate import (
+    HEADER,
+    MAGIC,
+    VERSION,
+    InvalidIntermediateError,
+    dump_intermediate,
+    load_intermediate,
+)
+from .main import ConvertOptions, convert_transcript
+from .transcript import Metadata, PackedContent, Transcript
+
+
+@pytest.fixture
+def transcript() -> Transcript:
+    return Transcript(
+        metadata=Metadata(
+            episode_title="Chapter 1: The Transdimensional Haboob.",
+            season=1,
+            date_published=datetime.fromisoformat("2020-05-26T07:00:00"),
+        ),
+        content=[
+            ("direction", "A BELL RINGS AS THE DOOR OPENS."),
+            ("character", "BUD"),
+            ("parenthetical", "(grumbling)"),
+            ("dialogue", "Welcome to Midnight Burger – café & grill."),
+            ("end", "THE END"),
+        ],
+    )
+
+
+def test_round_trip(transcript: Transcript, tmp_path: Path):
+    path = tmp_path / "script.mbt"
+    dump_intermediate(transcript, path)
+
+    loaded = load_intermediate(path)
+
+    assert isinstance(loaded.content, PackedContent)
+    assert loaded.metadata == transcript.metadata
+    assert loaded.content == transcript.content
+    assert dumps(loaded) == dumps(transcript)
+
+
+def test_round_trip_empty(tmp_path: Path):
+    path = tmp_path / "empty.mbt"
+    dump_intermediate(Transcript(), path)
+
+    loaded = load_intermediate(path)
+
+    assert loaded.metadata == Metadata()
+    assert list(loaded.content) == []
+
+
+def _corrupt(data: bytes, how: str) -> bytes:
+    _, _, metadata_len, count, text_len = HEADER.unpack_from(data)
+    match how:
+        case "short":
+            return data[: HEADER.size - 1]
+        case "magic":
+            return b"%PDF" + data[4:]
+        case "version":
+            header = HEADER.pack(MAGIC, VERSION + 1, metadata_len, count, text_len)
+            return header + data[HEADER.size :]
+        case "truncated":
+            return data[:-1]
+        case "extra":
+            return data + b"x"
+        case "metadata":
+            return data[: HEADER.size] + b"[" + data[HEADER.size + 1 :]
+    raise ValueError(how)
+
+
+@pytest.mark.parametrize(
+    "how", ["short", "magic", "version", "truncated", "extra", "metadata"]
+)
+def test_invalid(transcript: Transcript, tmp_path: Path, how: str):
+    path = tmp_path / "script.mbt"
+    dump_intermediate(transcript, path)
+    path.write_bytes(_corrupt(path.read_bytes(), how))
+
+    with pytest.raises(InvalidIntermediateError):
+        load_intermediate(path)
+
+
+def test_invalid_tag(transcript: Transcript, tmp_path: Path):
+    path = tmp_path / "script.mbt"
+    dump_intermediate(transcript, path)
+    data = bytearray(path.read_bytes())
+    metadata_len = HEADER.unpack_from(data)[2]
+    tags_start = HEADER.size + metadata_len + (-(HEADER.size + metadata_len) % 8)
+    data[tags_start] = 255
+    path.write_bytes(data)
+
+    with pytest.raises(InvalidIntermediateError, match="Unknown tag"):
+        load_intermediate(path)
+
+
+def _corrupt_content(data: bytearray, how: str):
+    metadata_len, count = HEADER.unpack_from(data)[2:4]
+    tags_start = HEADER.size + metadata_len + (-(HEADER.size + metadata_len) % 8)
+    ends_start = tags_start + count + (-count % 8)
+    ends = memoryview(data)[ends_start : ends_start + 8 * count].cast("Q")
+    text_start = ends_start + 8 * count
+    match how:
+        case "backwards":
+            ends[1], ends[2] = ends[2], ends[1]
+        case "split":
+            # Inside the en dash of the fourth element
+            dash = "Welcome to Midnight Burger –".encode()
+            ends[2] += len(dash) - 1
+        case "utf-8":
+            data[text_start] = 0xFF
+    ends.release()
+
+
+@pytest.mark.parametrize("how", ["backwards", "split", "utf-8"])
+def test_invalid_content(transcript: Transcript, tmp_path: Path, how: str):
+    path = tmp_path / "script.mbt"
+    dump_intermediate(transcript, path)
+    data = bytearray(path.read_bytes())
+    _corrupt_content(data, how)
+    path.write_bytes(data)
+
+    with pytest.raises(InvalidIntermediateError, match="Invalid content"):
+        load_intermediate(path)
+
+
+def test_convert_from_intermediate(transcript: Transcript, tmp_path: Path):
+    inp = tmp_path / "script.mbt"
+    output = tmp_path / "script.html"
+    dump_intermediate(transcript, inp)
+
+    convert_transcript(
+        inp, output, ConvertOptions(skip_scraping=True, from_intermediate=True)
+    )
+
+    html = output.read_text(encoding="utf-8")
+    # Normalised, which removes the trailing full stop from the title
+    assert 'title = "Chapter 1: The Transdimensional Haboob"' in html
+    assert '<p class="character">BUD</p>' in html
@@ -0,0 +1,88 @@
+"""Reading and writing the records kept as JSON in the cache directory.
+
+The manifest and the indexes of the output tree each save a JSON object mapping
+a key to a dataclass of its entry. The indexes also share how they notice
+changed files: by the modification time and size of each one.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable, Mapping
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class StatEntry(Protocol):
+    @property
+    def mtime_ns(self) -> int: ...
+
+    @property
+    def size(self) -> int: ...
+
+
+def load_entries[E](
+    file: Path, entry_type: Callable[..., E], name: str
+) -> dict[str, E]:
+    """Read the entries saved by `save_entries`.
+
+    A missing file has no entries, and neither does a corrupt one, which is
+    logged as a corrupt `name`.
+    """
+    if not file.exists():
+        return {}
+    with file.open("r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+            return {key: entry_type(**entry) for key, entry in data.items()}
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            # AttributeError and TypeError are from JSON of the wrong shape
+            logger.warning("Ignoring corrupt %s %s", name, file)
+            return {}
+
+
+def save_entries(file: Path, entries: Mapping[str, Any]):
+    """Replace `file` atomically with the entries, which must be dataclasses."""
+    file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = file.with_suffix(".tmp")
+    with tmp_file.open("w", encoding="utf-8") as f:
+        json.dump(
+            {key: asdict(entry) for key, entry in entries.items()},
+            f,
+            indent=1,
+            sort_keys=True,
+        )
+    os.replace(tmp_file, file)
+
+
+def file_key(root: Path, path: Path) -> str:
+    return path.relative_to(root).as_posix()
+
+
+def changed_files(
+    root: Path, entries: Mapping[str, StatEntry]
+) -> tuple[list[tuple[str, Path, os.stat_result]], set[str]]:
+    """Compare the HTML files under `root` with their entries, one `stat` each.
+
+    Returns:
+        the key, path and stat of each file which is new or has a different
+        modification time or size, and the keys of the entries whose file is
+        gone
+
+    """
+    changed = []
+    seen: set[str] = set()
+    for path in root.glob("**/*.html"):
+        key = file_key(root, path)
+        seen.add(key)
+        st = path.stat()
+        entry = entries.get(key)
+        if entry is None or (entry.mtime_ns, entry.size) != (
+            st.st_mtime_ns,
+            st.st_size,
+        ):
+            changed.append((key, path, st))
+    return changed, entries.keys() - seen
@@ -0,0 +1,62 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from .json_store import changed_files, load_entries, save_entries
+
+
+@dataclass(frozen=True)
+class Entry:
+    mtime_ns: int
+    size: int
+
+
+def test_round_trip(tmp_path: Path):
+    file = tmp_path / "cache" / "entries.json"
+    entries = {"a.html": Entry(1, 2), "b.html": Entry(3, 4)}
+
+    save_entries(file, entries)
+
+    assert load_entries(file, Entry, "index") == entries
+    assert not file.with_suffix(".tmp").exists()
+
+
+def test_load_missing(tmp_path: Path):
+    assert load_entries(tmp_path / "entries.json", Entry, "index") == {}
+
+
+@pytest.mark.parametrize(
+    "data", ['{"a.html": {"mtime_ns": 0}}', '{"a.html": 1}', "[]", "{"]
+)
+def test_load_corrupt(tmp_path: Path, caplog: pytest.LogCaptureFixture, data: str):
+    file = tmp_path / "entries.json"
+    file.write_text(data, encoding="utf-8")
+
+    assert load_entries(file, Entry, "index") == {}
+    assert f"Ignoring corrupt index {file}" in caplog.text
+
+
+def test_changed_files(tmp_path: Path):
+    for name in ("same.html", "changed.html", "new.html", "notes.txt"):
+        (tmp_path / name).write_text(name)
+    same = (tmp_path / "same.html").stat()
+    entries = {
+        "same.html": Entry(same.st_mtime_ns, same.st_size),
+        "changed.html": Entry(0, 0),
+        "gone.html": Entry(0, 0),
+    }
+
+    changed, removed = changed_files(tmp_path, entries)
+
+    assert sorted((key, path) for key, path, _ in changed) == [
+        ("changed.html", tmp_path / "changed.html"),
+        ("new.html", tmp_path / "new.html"),
+    ]
+    assert removed == {"gone.html"}
+
+    # Only the modification time has changed
+    os.utime(tmp_path / "same.html", ns=(0, 0))
+    changed, _ = changed_files(tmp_path, entries)
+    assert "same.html" in {key for key, _, _ in changed}
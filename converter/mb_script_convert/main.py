@@ -1,58 +1,307 @@
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from mb_script_convert.scrape_rss import scrape_episode_metadata
+from mb_script_convert.scrape_rss import (
+    MB_RSS_URL,
+    FeedSession,
+    scrape_episode_metadata,
+)
 
 from . import normalisations
-from .hugo_html import dump, load_metadata
+from .hugo_html import InvalidFrontmatterError, dump, load_metadata
 from .import_midnight_burger import import_transcript
+from .instrumentation import FileProfile, log_summary, recording, stage, write_report
+from .intermediate import SUFFIX, dump_intermediate, load_intermediate
+from .manifest import NOT_IN_MANIFEST, Manifest, ManifestEntry
+from .metadata_index import MetadataIndex
+from .pagefind import page_url, prune_records, write_missing_records, write_record
+from .pdf_layout import LoadProfile
+from .transcript import Transcript
+from .watch import DEBOUNCE, PollingWatcher
 
 logger = logging.getLogger(__name__)
 
 
-# TODO: pass in CLI arguments as typed object
+@dataclass(frozen=True)
+class ConvertOptions:
+    """Options which apply to the conversion of each individual transcript."""
+
+    episode_title: str | None = None
+    skip_scraping: bool = False
+    rss_urls: tuple[str, ...] = (MB_RSS_URL,)
+    debug: bool = False
+    load_profile: LoadProfile = "pdfminer"
+    element_cache: bool = field(default=False, metadata=NOT_IN_MANIFEST)
+    save_intermediate: bool = field(default=False, metadata=NOT_IN_MANIFEST)
+    from_intermediate: bool = False
+    # Write a Pagefind record of each transcript into this directory
+    pagefind_records: str | None = field(default=None, metadata=NOT_IN_MANIFEST)
+
+
+@dataclass
+class ConversionResult:
+    inp: Path
+    output: Path
+    error: str | None = None
+    log_records: list[logging.LogRecord] = field(default_factory=list)
+    profile: FileProfile | None = None
+
+
 def main(  # noqa: PLR0913
     in_file_or_dir: str,
     out_file_or_dir: str,
-    episode_title: str | None,
-    skip_scraping: bool,
-    rss_url: str | None,
+    options: ConvertOptions,
     overwrite: bool,
-    debug: bool,
+    jobs: int = 1,
+    manifest_file: Path | None = None,
+    feed_ttl: float | None = None,
+    profile_report: Path | None = None,
 ):
+    """Convert a PDF, or a directory of them.
+
+    If `manifest_file` is given, outputs are rebuilt only when the manifest
+    shows they are out of date. Without `overwrite`, outputs which the manifest
+    has no record of, or which were edited after they were written, are kept.
+    The RSS feed is fetched once for the whole run, or again once it is older
+    than `feed_ttl` seconds. When converting a directory, the metadata of the
+    existing outputs comes from a `MetadataIndex` of the output directory. If
+    `profile_report` is given, the time spent in each stage of each conversion
+    is written to it and summarised at the end. With `options.pagefind_records`,
+    outputs which weren't converted get any missing record from their HTML.
+    """
     logging.basicConfig(level=logging.INFO, format="{levelname}: {message}", style="{")
 
     in_path = Path(in_file_or_dir)
     out_path = Path(out_file_or_dir)
+    _check_records_output(out_path, options)
+
+    session = FeedSession(feed_ttl)
+    manifest = None
+    if manifest_file is not None:
+        manifest = Manifest(manifest_file)
+        manifest.load()
 
     if in_path.is_dir():
         if not out_path.is_dir():
             msg = "when input is a directory, output must also be a directory"
             raise RuntimeError(msg)
-        for pdf_path in in_path.glob("**/*.pdf"):
-            output_file_path = make_output_path(pdf_path, in_path, out_path)
-            if not overwrite and output_file_path.exists():
-                logger.info("Skipping: %s -> %s", pdf_path, output_file_path)
-                continue
-            convert_transcript(
-                pdf_path,
-                output_file_path,
-                episode_title,
-                skip_scraping,
-                rss_url,
-                debug,
-            )
+        candidates = [
+            (pdf_path, make_output_path(pdf_path, in_path, out_path))
+            for pdf_path in sorted(in_path.glob(_input_pattern(options)))
+        ]
+        batch, entries = _plan_batch(candidates, options, overwrite, manifest)
+        index = _load_index(out_path)
+        results = convert_batch(
+            batch, options, jobs, session, index, profile=profile_report is not None
+        )
+        if manifest is not None:
+            _update_manifest(manifest, results, entries)
+        index.refresh()
+        index.save()
+        _update_records(sorted(out_path.glob("**/*.html")), out_path, options)
     elif in_path.is_file():
-        if not overwrite and out_path.exists():
-            logger.info("Skipping: %s -> %s", in_path, out_path)
-        else:
-            convert_transcript(
-                in_path, out_path, episode_title, skip_scraping, rss_url, debug
+        batch, entries = _plan_batch(
+            [(in_path, out_path)], options, overwrite, manifest
+        )
+        results = []
+        for inp, output in batch:
+            result = ConversionResult(
+                inp, output, profile=_new_profile(inp, profile_report is not None)
             )
+            with recording(result.profile):
+                convert_transcript(inp, output, options, session)
+            results.append(result)
+        if manifest is not None:
+            _update_manifest(manifest, results, entries)
+        if out_path.exists():
+            _update_records([out_path], None, options)
+    else:
+        msg = f"not a valid file or directory: {in_file_or_dir}"
+        raise RuntimeError(msg)
+
+    if profile_report is not None:
+        _report_profiles(profile_report, results)
+    failed = [result for result in results if result.error is not None]
+    if failed:
+        for result in failed:
+            logger.error("Failed: %s (%s)", result.inp, result.error)
+        msg = f"{len(failed)} of {len(results)} conversions failed"
+        raise RuntimeError(msg)
+
+
+def watch(  # noqa: PLR0913
+    in_file_or_dir: str,
+    out_file_or_dir: str,
+    options: ConvertOptions,
+    interval: float = 1.0,
+    debounce: float = DEBOUNCE,
+    feed_ttl: float | None = None,
+):
+    """Reconvert each PDF as it changes, until interrupted.
+
+    Everything which outlives a single conversion is loaded once for the whole
+    session: the RSS feed, which is only revalidated after `feed_ttl` seconds,
+    and the `MetadataIndex` of the output directory. PDFs which already exist
+    are only converted once they change.
+
+    Args:
+        in_file_or_dir: the PDF, or directory of PDFs, to watch
+        out_file_or_dir: where to write the output, as for `main`
+        options: passed on to `convert_transcript` for every file
+        interval: how often to check for changes, in seconds
+        debounce: how long a PDF must be left unchanged before converting it
+        feed_ttl: revalidate the RSS feed after this many seconds
+
+    """
+    logging.basicConfig(level=logging.INFO, format="{levelname}: {message}", style="{")
+
+    in_path = Path(in_file_or_dir)
+    out_path = Path(out_file_or_dir)
+    _check_records_output(out_path, options)
+    if in_path.is_dir():
+        if not out_path.is_dir():
+            msg = "when input is a directory, output must also be a directory"
+            raise RuntimeError(msg)
+        index = _load_index(out_path)
+    elif in_path.is_file():
+        index = None
     else:
         msg = f"not a valid file or directory: {in_file_or_dir}"
         raise RuntimeError(msg)
 
+    session = FeedSession(feed_ttl)
+    if not options.skip_scraping:
+        session.get_many(options.rss_urls)
+
+    watcher = PollingWatcher(in_path, debounce, _input_pattern(options))
+    logger.info("Watching %s for changes; press Ctrl-C to stop", in_path)
+    while True:
+        changed = watcher.poll()
+        for inp in changed:
+            output = (
+                make_output_path(inp, in_path, out_path)
+                if index is not None
+                else out_path
+            )
+            result = _convert_catching_errors(inp, output, options, session, index)
+            if result.error is not None:
+                logger.error("Failed: %s (%s)", result.inp, result.error)
+        if changed and index is not None:
+            index.refresh()
+            index.save()
+        time.sleep(interval)
+
+
+def _input_pattern(options: ConvertOptions) -> str:
+    return f"**/*{SUFFIX}" if options.from_intermediate else "**/*.pdf"
+
+
+def _report_profiles(profile_report: Path, results: list[ConversionResult]):
+    profiles = [result.profile for result in results if result.profile is not None]
+    write_report(profile_report, profiles)
+    log_summary(profiles)
+
+
+def _plan_batch(
+    candidates: list[tuple[Path, Path]],
+    options: ConvertOptions,
+    overwrite: bool,
+    manifest: Manifest | None,
+) -> tuple[list[tuple[Path, Path]], dict[Path, ManifestEntry]]:
+    """Work out which of the candidate conversions need to be run."""
+    batch: list[tuple[Path, Path]] = []
+    entries: dict[Path, ManifestEntry] = {}
+    for inp, output in candidates:
+        if manifest is not None:
+            entry = manifest.make_entry(inp, options)
+            if manifest.is_up_to_date(output, entry):
+                logger.info("Up to date: %s -> %s", inp, output)
+                continue
+            if not overwrite and _keep_existing(inp, output, manifest):
+                continue
+            entries[output] = entry
+        elif not overwrite and output.exists():
+            logger.info("Skipping: %s -> %s", inp, output)
+            continue
+        batch.append((inp, output))
+    return batch, entries
+
+
+def _keep_existing(inp: Path, output: Path, manifest: Manifest) -> bool:
+    """Check whether an out of date output should be kept, unless overwriting.
+
+    Only outputs written by an incremental build, and unchanged since, are
+    replaced without asking.
+    """
+    if not output.exists():
+        return False
+    if output not in manifest:
+        logger.info("Skipping: %s -> %s (not in the manifest)", inp, output)
+        return True
+    if manifest.is_edited(output):
+        logger.warning(
+            "Skipping: %s -> %s (edited since it was converted; use -O to replace it)",
+            inp,
+            output,
+        )
+        return True
+    return False
+
+
+def _check_records_output(out_path: Path, options: ConvertOptions):
+    """Fail before converting anything if the outputs can't have Pagefind records."""
+    if options.pagefind_records is None:
+        return
+    try:
+        page_url(out_path / "index.html" if out_path.is_dir() else out_path)
+    except ValueError as e:
+        msg = f"cannot write Pagefind records: {e}"
+        raise RuntimeError(msg) from e
+
+
+def _update_records(outputs: list[Path], out_dir: Path | None, options: ConvertOptions):
+    """Fill in the Pagefind records of outputs which weren't converted.
+
+    Records are also removed for pages under `out_dir` which have no output.
+    """
+    if options.pagefind_records is None:
+        return
+    records_dir = Path(options.pagefind_records)
+    written = write_missing_records(outputs, records_dir)
+    removed = 0 if out_dir is None else prune_records(out_dir, records_dir)
+    logger.info("Pagefind records: %d written, %d removed", written, removed)
+
+
+def _update_manifest(
+    manifest: Manifest,
+    results: list[ConversionResult],
+    entries: dict[Path, ManifestEntry],
+):
+    for result in results:
+        if result.error is None:
+            manifest.record(result.output, entries[result.output])
+    manifest.save()
+    logger.info(
+        "Manifest: %d up to date, %d out of date", manifest.hits, manifest.misses
+    )
+
+
+def _load_index(out_path: Path) -> MetadataIndex:
+    index = MetadataIndex(out_path)
+    index.load()
+    parsed = index.refresh()
+    index.save()
+    logger.info("Metadata index: read %d of %d outputs", parsed, len(index.entries))
+    for title, paths in index.duplicates().items():
+        logger.warning(
+            "%s appears in more than one file: %s", title, ", ".join(map(str, paths))
+        )
+    return index
+
 
 def make_output_path(inp: Path, inp_base: Path, out_base: Path) -> Path:
     """Make an output path for a converted PDF.
@@ -79,21 +328,182 @@ def make_output_path(inp: Path, inp_base: Path, out_base: Path) -> Path:
         return output_html
 
 
-def convert_transcript(  # noqa: PLR0913
+def convert_batch(  # noqa: PLR0913
+    batch: list[tuple[Path, Path]],
+    options: ConvertOptions,
+    jobs: int = 1,
+    session: FeedSession | None = None,
+    index: MetadataIndex | None = None,
+    profile: bool = False,
+) -> list[ConversionResult]:
+    """Convert many transcripts, continuing past any that fail.
+
+    With `jobs` greater than one the conversions are spread across a process
+    pool. Each worker buffers its log records, and they are replayed here in the
+    order of `batch` so that the output reads the same as a sequential run.
+
+    Args:
+        batch: pairs of input PDF and output path
+        options: passed on to `convert_transcript` for every file
+        jobs: the number of worker processes; 0 means one per CPU
+        session: shared by every conversion; when using a process pool the RSS
+            feed is fetched up front so that the workers get a copy of it
+        index: the metadata of the existing outputs, if they have been indexed
+        profile: record the time spent in each stage into the results
+
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if options.debug and jobs > 1:
+        logger.warning("Debug visualisation needs a single process; ignoring --jobs")
+        jobs = 1
+
+    if session is None:
+        session = FeedSession()
+
+    if jobs == 1 or len(batch) <= 1:
+        return [
+            _convert_catching_errors(inp, out, options, session, index, profile)
+            for inp, out in batch
+        ]
+
+    if not options.skip_scraping:
+        session.get_many(options.rss_urls)
+
+    results: list[ConversionResult] = []
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(batch)),
+        initializer=_init_worker,
+        initargs=(session, index),
+    ) as executor:
+        for result in executor.map(
+            _convert_in_worker,
+            [inp for inp, _ in batch],
+            [out for _, out in batch],
+            [options] * len(batch),
+            [profile] * len(batch),
+        ):
+            for record in result.log_records:
+                logging.getLogger(record.name).handle(record)
+            result.log_records = []
+            results.append(result)
+    return results
+
+
+def _new_profile(inp: Path, profile: bool) -> FileProfile | None:
+    return FileProfile(str(inp)) if profile else None
+
+
+def _convert_catching_errors(  # noqa: PLR0913
+    inp: Path,
+    output: Path,
+    options: ConvertOptions,
+    session: FeedSession,
+    index: MetadataIndex | None = None,
+    profile: bool = False,
+) -> ConversionResult:
+    result = ConversionResult(inp, output, profile=_new_profile(inp, profile))
+    try:
+        with recording(result.profile):
+            convert_transcript(inp, output, options, session, index)
+    except Exception as e:
+        logger.exception("Error converting %s", inp)
+        result.error = repr(e)
+    return result
+
+
+class _RecordBuffer(logging.Handler):
+    """Holds log records in a worker process until they can be sent back."""
+
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord):
+        # Format eagerly so that the record survives pickling
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
+
+
+_worker_log_buffer = _RecordBuffer()
+_worker_session = FeedSession()
+_worker_index: MetadataIndex | None = None
+
+
+def _init_worker(session: FeedSession, index: MetadataIndex | None):
+    global _worker_session, _worker_index  # noqa: PLW0603
+    _worker_session = session
+    _worker_index = index
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_worker_log_buffer)
+    root.setLevel(logging.INFO)
+
+
+def _convert_in_worker(
+    inp: Path, output: Path, options: ConvertOptions, profile: bool
+) -> ConversionResult:
+    _worker_log_buffer.records = []
+    result = _convert_catching_errors(
+        inp, output, options, _worker_session, _worker_index, profile
+    )
+    result.log_records = _worker_log_buffer.records
+    return result
+
+
+def convert_transcript(
     inp: Path,
     output: Path,
-    episode_title: str | None,
-    skip_scraping: bool,
-    rss_url: str | None,
-    debug: bool,
+    options: ConvertOptions,
+    session: FeedSession | None = None,
+    index: MetadataIndex | None = None,
 ):
     logger.info("Converting: %s -> %s", inp, output)
-    doc = import_transcript(str(inp), debug)
-    normalisations.run_all(doc)
-    if output.exists():
-        load_metadata(output, doc)
-    if episode_title:
-        doc.metadata.episode_title = episode_title
-    if not skip_scraping:
-        scrape_episode_metadata(doc, rss_url)
-    dump(doc, output)
+    if options.from_intermediate:
+        with stage("load_intermediate"):
+            doc = load_intermediate(inp)
+    else:
+        doc = import_transcript(
+            str(inp), options.debug, options.load_profile, options.element_cache
+        )
+    if options.save_intermediate:
+        with stage("dump_intermediate"):
+            dump_intermediate(doc, inp.with_suffix(SUFFIX))
+    with stage("normalisations"):
+        normalisations.run_all(doc)
+    with stage("load_metadata"):
+        if index is not None and output in index:
+            existing = index.metadata(output)
+            if existing is not None:
+                doc.metadata = existing
+        elif output.exists():
+            try:
+                load_metadata(output, doc)
+            except InvalidFrontmatterError as e:
+                logger.warning("Ignoring metadata in existing output: %s", e)
+    if options.episode_title:
+        doc.metadata.episode_title = options.episode_title
+    if not options.skip_scraping:
+        with stage("scrape_episode_metadata"):
+            scrape_episode_metadata(doc, options.rss_urls, session)
+    if index is not None:
+        _warn_duplicates(doc, output, index)
+    with stage("dump"):
+        dump(doc, output)
+    if options.pagefind_records is not None:
+        with stage("pagefind_record"):
+            write_record(doc, output, Path(options.pagefind_records))
+
+
+def _warn_duplicates(doc: Transcript, output: Path, index: MetadataIndex):
+    title = doc.metadata.episode_title
+    if title is None:
+        return
+    for path in index.find_title(title):
+        if path != output:
+            logger.warning("%s is already in %s", title, path)
@@ -1,6 +1,13 @@
+import logging
 from pathlib import Path
 
-from .main import make_output_path
+import pytest
+
+from .hugo_html import dump
+from .main import ConvertOptions, _plan_batch, convert_batch, main, make_output_path
+from .manifest import Manifest
+from .pagefind import record_path, write_record
+from .transcript import Transcript
 
 
 def test_make_output_path(tmp_path: Path):
@@ -21,3 +28,85 @@ def test_make_output_path(tmp_path: Path):
     assert (
         make_output_path(input3, input_base, tmp_path) == tmp_path / "sub" / "baz.html"
     )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_convert_batch_collects_errors(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, jobs: int
+):
+    batch = []
+    for name in ("a", "b", "c"):
+        inp = tmp_path / f"{name}.pdf"
+        inp.write_bytes(b"not a pdf")
+        batch.append((inp, tmp_path / f"{name}.html"))
+
+    with caplog.at_level(logging.INFO):
+        results = convert_batch(batch, ConvertOptions(skip_scraping=True), jobs)
+
+    assert [(r.inp, r.output) for r in results] == batch
+    assert all(r.error is not None for r in results)
+    converting = [
+        r.getMessage()
+        for r in caplog.records
+        if r.getMessage().startswith("Converting")
+    ]
+    assert converting == [f"Converting: {inp} -> {out}" for inp, out in batch]
+
+
+def test_main_fills_in_records_without_converting(tmp_path: Path):
+    pdfs = tmp_path / "pdfs"
+    pdfs.mkdir()
+    (pdfs / "a.pdf").write_bytes(b"not a pdf")
+    content = tmp_path / "content"
+    output = content / "a.html"
+    dump(Transcript(content=[("dialogue", "Hello?")]), output)
+    html = output.read_bytes()
+    records = tmp_path / "records"
+    stale = write_record(Transcript(), content / "gone.html", records)
+    options = ConvertOptions(skip_scraping=True, pagefind_records=str(records))
+
+    main(str(pdfs), str(content), options, overwrite=False)
+
+    assert output.read_bytes() == html
+    assert record_path(records, "/a/").exists()
+    assert not stale.exists()
+
+
+@pytest.mark.parametrize("overwrite", [False, True])
+def test_plan_batch_keeps_outputs_not_from_the_manifest(
+    tmp_path: Path, overwrite: bool
+):
+    options = ConvertOptions(skip_scraping=True)
+    manifest = Manifest(tmp_path / "manifest.json")
+    candidates = []
+    for name in ("new", "unrecorded", "recorded", "edited"):
+        inp = tmp_path / f"{name}.pdf"
+        inp.write_bytes(b"pdf")
+        candidates.append((inp, tmp_path / f"{name}.html"))
+    for _, output in candidates[1:]:
+        output.write_text("html")
+    for inp, output in candidates[2:]:
+        manifest.record(output, manifest.make_entry(inp, options))
+        inp.write_bytes(b"new pdf")
+    candidates[3][1].write_text("edited html")
+
+    batch, entries = _plan_batch(candidates, options, overwrite, manifest)
+
+    if overwrite:
+        assert batch == candidates
+    else:
+        assert batch == [candidates[0], candidates[2]]
+    assert list(entries) == [output for _, output in batch]
+
+
+def test_main_checks_records_output_first(tmp_path: Path):
+    inp = tmp_path / "a.pdf"
+    inp.write_bytes(b"not a pdf")
+    output = tmp_path / "public" / "a.html"
+    options = ConvertOptions(
+        skip_scraping=True, pagefind_records=str(tmp_path / "records")
+    )
+
+    with pytest.raises(RuntimeError, match="not in a Hugo content directory"):
+        main(str(inp), str(output), options, overwrite=False)
+    assert not output.exists()
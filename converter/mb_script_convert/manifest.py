@@ -0,0 +1,150 @@
+"""A record of previous conversions, used to skip the ones that are up to date."""
+
+import hashlib
+import json
+import logging
+from contextlib import suppress
+from dataclasses import dataclass, fields
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from .cache_dir import CACHE_DIR
+from .json_store import load_entries, save_entries
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = CACHE_DIR / "manifest.json"
+
+# Third party packages whose behaviour changes the output
+_CONVERTER_DEPENDENCIES = ("pdfminer.six", "py-pdf-parser")
+
+# Field metadata for an option which doesn't change the output, such as one
+# which only enables a cache, so that changing it doesn't invalidate the manifest
+NOT_IN_MANIFEST = {"manifest": False}
+
+
+def file_digest(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+@cache
+def converter_version() -> str:
+    """Fingerprint the converter, so that changing its logic invalidates the manifest.
+
+    This hashes the source of this package, excluding tests, along with the
+    versions of the libraries used to read the PDFs.
+    """
+    h = hashlib.sha256()
+    package_dir = Path(__file__).parent
+    for source in sorted(package_dir.rglob("*.py")):
+        if source.name.endswith("_test.py"):
+            continue
+        h.update(source.relative_to(package_dir).as_posix().encode())
+        h.update(source.read_bytes())
+    for dependency in _CONVERTER_DEPENDENCIES:
+        with suppress(PackageNotFoundError):
+            h.update(f"{dependency}=={version(dependency)}".encode())
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    source: str
+    converter: str
+    options: dict[str, Any]
+    output: str | None = None
+
+
+class Manifest:
+    """Maps each output file to the inputs which produced it.
+
+    An output is up to date if its source PDF, the converter and the options are
+    all unchanged since it was written, and the output itself hasn't been
+    modified since.
+    """
+
+    def __init__(self, manifest_file: str | Path):
+        self.manifest_file = Path(manifest_file)
+        self.entries: dict[str, ManifestEntry] = {}
+        self.modified = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        self.entries = load_entries(self.manifest_file, ManifestEntry, "manifest")
+
+    def save(self):
+        if not self.modified:
+            return
+        save_entries(self.manifest_file, self.entries)
+        self.modified = False
+
+    @staticmethod
+    def make_entry(inp: Path, options: Any) -> ManifestEntry:
+        """Describe the inputs to a conversion.
+
+        Args:
+            inp: the source PDF
+            options: a dataclass of the options used for the conversion; fields
+                with the metadata `NOT_IN_MANIFEST` are left out
+
+        """
+        recorded = {
+            option.name: getattr(options, option.name)
+            for option in fields(options)
+            if option.metadata.get("manifest", True)
+        }
+        return ManifestEntry(
+            source=file_digest(inp),
+            converter=converter_version(),
+            # As they will be when read back from the manifest
+            options=json.loads(json.dumps(recorded)),
+        )
+
+    def is_up_to_date(self, output: Path, entry: ManifestEntry) -> bool:
+        """Check whether `output` was produced from the inputs in `entry`.
+
+        Also counts the result towards `hits` and `misses`.
+        """
+        recorded = self.entries.get(self._key(output))
+        up_to_date = (
+            recorded is not None
+            and (recorded.source, recorded.converter, recorded.options)
+            == (entry.source, entry.converter, entry.options)
+            and output.exists()
+            and recorded.output == file_digest(output)
+        )
+        if up_to_date:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return up_to_date
+
+    def __contains__(self, output: Path) -> bool:
+        return self._key(output) in self.entries
+
+    def is_edited(self, output: Path) -> bool:
+        """Check whether `output` has changed since it was recorded as written."""
+        recorded = self.entries.get(self._key(output))
+        return (
+            recorded is not None
+            and output.exists()
+            and recorded.output != file_digest(output)
+        )
+
+    def record(self, output: Path, entry: ManifestEntry):
+        """Record that `output` has just been written from the inputs in `entry`."""
+        self.entries[self._key(output)] = ManifestEntry(
+            source=entry.source,
+            converter=entry.converter,
+            options=entry.options,
+            output=file_digest(output),
+        )
+        self.modified = True
+
+    @staticmethod
+    def _key(output: Path) -> str:
+        return output.resolve().as_posix()
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from .main import ConvertOptions
+from .manifest import Manifest
+
+
+@dataclass(frozen=True)
+class FakeOptions:
+    skip_scraping: bool = False
+    rss_urls: tuple[str, ...] = ("https://example.com/feed",)
+
+
+def test_manifest(tmp_path: Path):
+    manifest_file = tmp_path / "manifest.json"
+    source = tmp_path / "in.pdf"
+    output = tmp_path / "out.html"
+    source.write_bytes(b"pdf")
+
+    manifest = Manifest(manifest_file)
+    entry = manifest.make_entry(source, FakeOptions())
+    assert not manifest.is_up_to_date(output, entry)
+
+    output.write_text("html")
+    manifest.record(output, entry)
+    manifest.save()
+    assert manifest_file.exists()
+
+    manifest_2 = Manifest(manifest_file)
+    manifest_2.load()
+    assert manifest_2.is_up_to_date(
+        output, manifest_2.make_entry(source, FakeOptions())
+    )
+    assert not manifest_2.is_up_to_date(
+        output, manifest_2.make_entry(source, FakeOptions(skip_scraping=True))
+    )
+
+    source.write_bytes(b"new pdf")
+    assert not manifest_2.is_up_to_date(
+        output, manifest_2.make_entry(source, FakeOptions())
+    )
+    assert (manifest_2.hits, manifest_2.misses) == (1, 2)
+
+
+def test_manifest_detects_edited_output(tmp_path: Path):
+    source = tmp_path / "in.pdf"
+    output = tmp_path / "out.html"
+    source.write_bytes(b"pdf")
+    output.write_text("html")
+
+    manifest = Manifest(tmp_path / "manifest.json")
+    entry = manifest.make_entry(source, FakeOptions())
+    manifest.record(output, entry)
+    assert manifest.is_up_to_date(output, entry)
+
+    output.write_text("edited html")
+    assert not manifest.is_up_to_date(output, entry)
+
+
+def test_manifest_is_edited(tmp_path: Path):
+    source = tmp_path / "in.pdf"
+    output = tmp_path / "out.html"
+    source.write_bytes(b"pdf")
+    output.write_text("html")
+
+    manifest = Manifest(tmp_path / "manifest.json")
+    assert output not in manifest
+    assert not manifest.is_edited(output)
+
+    manifest.record(output, manifest.make_entry(source, FakeOptions()))
+    assert output in manifest
+    assert not manifest.is_edited(output)
+
+    output.write_text("edited html")
+    assert manifest.is_edited(output)
+
+
+def test_manifest_ignores_options_not_in_manifest(tmp_path: Path):
+    source = tmp_path / "in.pdf"
+    source.write_bytes(b"pdf")
+    manifest = Manifest(tmp_path / "manifest.json")
+
+    entry = manifest.make_entry(source, ConvertOptions(element_cache=False))
+    cached = manifest.make_entry(
+        source,
+        ConvertOptions(
+            element_cache=True, save_intermediate=True, pagefind_records="records"
+        ),
+    )
+
+    assert entry == cached
+    assert "element_cache" not in entry.options
+    assert entry != manifest.make_entry(source, ConvertOptions(skip_scraping=True))
+
+
+@pytest.mark.parametrize(
+    "data",
+    ['{"/out.html": {"source": "a", "converter": "b"}}', '{"/out.html": 1}', "[]", "{"],
+)
+def test_manifest_ignores_corrupt_file(tmp_path: Path, data: str):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(data, encoding="utf-8")
+
+    manifest = Manifest(manifest_file)
+    manifest.load()
+
+    assert manifest.entries == {}
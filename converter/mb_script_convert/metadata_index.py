@@ -0,0 +1,125 @@
+"""An index of the metadata of every transcript in the output tree."""
+
+import logging
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from adaptix.load_error import LoadError
+
+from .cache_dir import CACHE_DIR, cache_key
+from .hugo_html import InvalidFrontmatterError, read_frontmatter, retort
+from .json_store import changed_files, file_key, load_entries, save_entries
+from .transcript import Metadata
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = CACHE_DIR / "metadata-index"
+
+
+def index_file_for(root: Path) -> Path:
+    """Pick a file in the cache directory to hold the index of `root`."""
+    return INDEX_DIR / f"{cache_key(root)}.json"
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    mtime_ns: int
+    size: int
+    # Serialised with the same retort as the frontmatter, or None if the file
+    # has no valid frontmatter
+    metadata: dict[str, Any] | None
+
+
+class MetadataIndex:
+    """Maps each transcript under `root` to its metadata, and back again.
+
+    The frontmatter of a file is only parsed when its modification time or
+    size has changed since the last `refresh`, so keeping the index up to date
+    costs one `stat` per file.
+    """
+
+    def __init__(self, root: str | Path, index_file: str | Path | None = None):
+        self.root = Path(root)
+        self.index_file = (
+            index_file_for(self.root) if index_file is None else Path(index_file)
+        )
+        self.entries: dict[str, IndexEntry] = {}
+        self.modified = False
+        self._by_title: dict[str, list[str]] = {}
+
+    def load(self):
+        self.entries = load_entries(self.index_file, IndexEntry, "index")
+        self._build_lookups()
+
+    def save(self):
+        if not self.modified:
+            return
+        save_entries(self.index_file, self.entries)
+        self.modified = False
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the files under `root`.
+
+        Returns:
+            the number of files whose frontmatter had to be read
+
+        """
+        changed, removed = changed_files(self.root, self.entries)
+        for key, path, st in changed:
+            self.entries[key] = _read_entry(path, st)
+        for key in removed:
+            del self.entries[key]
+        if changed or removed:
+            self.modified = True
+        self._build_lookups()
+        return len(changed)
+
+    def __contains__(self, path: Path) -> bool:
+        return path.is_relative_to(self.root) and self._key(path) in self.entries
+
+    def metadata(self, path: Path) -> Metadata | None:
+        """Get the metadata of the transcript at `path`, if it is indexed."""
+        entry = self.entries.get(self._key(path))
+        if entry is None or entry.metadata is None:
+            return None
+        return retort.load(entry.metadata, Metadata)
+
+    def find_title(self, episode_title: str) -> list[Path]:
+        return [self.root / key for key in self._by_title.get(episode_title, [])]
+
+    def duplicates(self) -> dict[str, list[Path]]:
+        """Find episode titles which appear in more than one file.
+
+        Titles are compared rather than episode numbers, because the parts of an
+        interlude share a number.
+        """
+        return {
+            title: [self.root / key for key in keys]
+            for title, keys in self._by_title.items()
+            if len(keys) > 1
+        }
+
+    def _build_lookups(self):
+        by_title = defaultdict(list)
+        for key, entry in sorted(self.entries.items()):
+            if entry.metadata is None:
+                continue
+            metadata = retort.load(entry.metadata, Metadata)
+            if metadata.episode_title is not None:
+                by_title[metadata.episode_title].append(key)
+        self._by_title = dict(by_title)
+
+    def _key(self, path: Path) -> str:
+        return file_key(self.root, path)
+
+
+def _read_entry(path: Path, st: os.stat_result) -> IndexEntry:
+    try:
+        metadata = retort.load(read_frontmatter(path), Metadata)
+    except (InvalidFrontmatterError, LoadError) as e:
+        logger.warning("Not indexing %s: %s", path, e)
+        return IndexEntry(st.st_mtime_ns, st.st_size, None)
+    return IndexEntry(st.st_mtime_ns, st.st_size, retort.dump(metadata))
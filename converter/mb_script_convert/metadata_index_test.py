@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from .hugo_html import dump
+from .metadata_index import MetadataIndex
+from .transcript import Metadata, Transcript
+
+
+def write_transcript(path: Path, title: str, season: int, number: int):
+    dump(
+        Transcript(
+            Metadata(episode_title=title, season=season, season_episode_number=number)
+        ),
+        path,
+    )
+
+
+def test_metadata_index(tmp_path: Path):
+    root = tmp_path / "transcripts"
+    index_file = tmp_path / "index.json"
+    write_transcript(root / "season-1" / "chapter-1.html", "Chapter 1", 1, 1)
+    write_transcript(root / "season-1" / "chapter-2" / "index.html", "Chapter 2", 1, 2)
+    (root / "broken.html").write_text("<p>no frontmatter</p>\n")
+
+    index = MetadataIndex(root, index_file)
+    index.load()
+    assert (index.refresh(), len(index.entries)) == (3, 3)
+    index.save()
+
+    chapter_1 = root / "season-1" / "chapter-1.html"
+    assert chapter_1 in index
+    assert tmp_path / "elsewhere.html" not in index
+    assert index.metadata(chapter_1) == Metadata(
+        episode_title="Chapter 1", season=1, season_episode_number=1
+    )
+    assert index.metadata(root / "broken.html") is None
+    assert index.find_title("Chapter 2") == [
+        root / "season-1" / "chapter-2" / "index.html"
+    ]
+    assert index.duplicates() == {}
+
+    index_2 = MetadataIndex(root, index_file)
+    index_2.load()
+    assert index_2.find_title("Chapter 1") == [chapter_1]
+    assert index_2.refresh() == 0
+
+    # Only changed files are read again
+    copy = root / "season-1" / "chapter-1-copy.html"
+    write_transcript(copy, "Chapter 2", 1, 2)
+    write_transcript(chapter_1, "Chapter One", 1, 1)
+    st = chapter_1.stat()
+    os.utime(chapter_1, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    (root / "broken.html").unlink()
+    assert (index_2.refresh(), len(index_2.entries)) == (2, 3)
+    assert root / "broken.html" not in index_2
+    assert index_2.find_title("Chapter One") == [chapter_1]
+    assert index_2.duplicates() == {
+        "Chapter 2": [copy, root / "season-1" / "chapter-2" / "index.html"]
+    }
+
+
+@pytest.mark.parametrize(
+    "data", ['{"a.html": {"mtime_ns": 0, "size": 0}}', '{"a.html": 1}', "[]", "{"]
+)
+def test_metadata_index_rebuilds_corrupt_file(tmp_path: Path, data: str):
+    root = tmp_path / "transcripts"
+    index_file = tmp_path / "index.json"
+    write_transcript(root / "chapter-1.html", "Chapter 1", 1, 1)
+    index_file.write_text(data, encoding="utf-8")
+
+    index = MetadataIndex(root, index_file)
+    index.load()
+    assert index.entries == {}
+    assert index.refresh() == 1
+    assert index.find_title("Chapter 1") == [root / "chapter-1.html"]
@@ -0,0 +1,166 @@
+"""Search records for Pagefind, made from transcripts as they are converted.
+
+Pagefind normally builds the site's search index by crawling every rendered
+transcript page. Instead, each conversion can write a record of the transcript
+in the shape taken by Pagefind's `addCustomRecord`, and `scripts/pagefind.mjs`
+indexes the records without reading the site. A record holds what the
+transcript page exposes to Pagefind: the text of its body, the title as
+metadata, the series as a filter and the date as a sort key, along with the
+season as a filter.
+
+Records are also written for existing outputs which are missing one, from the
+outputs themselves, and removed once their output is gone.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from adaptix.load_error import LoadError
+
+from .hugo_html import InvalidContentError, InvalidFrontmatterError, load
+from .transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# Hugo's default contentDir, under which a page's path is its URL
+CONTENT_DIR_NAME = "content"
+LANGUAGE = "en"
+RECORD_SUFFIX = ".json"
+
+
+def page_url(output: Path) -> str:
+    """Find the URL Hugo will publish an output file at.
+
+    Raises:
+        ValueError: if the output isn't inside a Hugo content directory
+
+    """
+    output = output.absolute()
+    for parent in output.parents:
+        if parent.name == CONTENT_DIR_NAME:
+            break
+    else:
+        msg = f"{output} is not in a Hugo {CONTENT_DIR_NAME} directory"
+        raise ValueError(msg)
+    page = output.relative_to(parent)
+    page = page.parent if page.name == "index.html" else page.with_suffix("")
+    if page == Path():
+        return "/"
+    # Hugo lower cases paths by default
+    return f"/{page.as_posix().lower()}/"
+
+
+def record_path(records_dir: Path, url: str) -> Path:
+    return records_dir / (url.strip("/") + RECORD_SUFFIX)
+
+
+def _hugo_date(date: datetime) -> str:
+    """Format a date as the transcript layout does, in Hugo's default time zone."""
+    offset = date.utcoffset()
+    zone = "Z"
+    if offset:
+        sign = "-" if offset < timedelta(0) else "+"
+        minutes = abs(offset) // timedelta(minutes=1)
+        zone = f"{sign}{minutes // 60:02}:{minutes % 60:02}"
+    return date.strftime("%Y-%m-%dT%H:%M:%S") + zone
+
+
+def make_record(transcript: Transcript, url: str) -> dict[str, Any]:
+    """Describe a transcript as a Pagefind custom record."""
+    metadata = transcript.metadata
+    heading = [metadata.series, metadata.episode_title]
+    lines = [line for line in heading if line]
+    lines.extend(text for _, text in transcript.content)
+
+    record: dict[str, Any] = {
+        "url": url,
+        "content": "\n".join(lines),
+        "language": LANGUAGE,
+        "meta": {},
+        "filters": {},
+        "sort": {},
+    }
+    if metadata.episode_title:
+        record["meta"]["title"] = metadata.episode_title
+    if metadata.series:
+        record["filters"]["series"] = [metadata.series]
+    if metadata.season is not None:
+        record["filters"]["season"] = [str(metadata.season)]
+    if metadata.date_published is not None:
+        record["sort"]["date"] = _hugo_date(metadata.date_published)
+    return record
+
+
+def write_record(transcript: Transcript, output: Path, records_dir: Path) -> Path:
+    """Write the record for the transcript being written to `output`.
+
+    The record is only replaced if it has changed, so that its modification time
+    shows when the transcript's search data last changed.
+    """
+    url = page_url(output)
+    path = record_path(records_dir, url)
+    data = json.dumps(make_record(transcript, url), ensure_ascii=False, indent=1)
+    data = data.encode("utf-8")
+    if path.exists() and path.read_bytes() == data:
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix(".tmp")
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, path)
+    return path
+
+
+def write_missing_records(outputs: Iterable[Path], records_dir: Path) -> int:
+    """Write a record for each output which has none, reading the output itself.
+
+    Returns:
+        the number of records written
+
+    """
+    written = 0
+    for output in outputs:
+        try:
+            if record_path(records_dir, page_url(output)).exists():
+                continue
+            transcript = load(output, pack=True)
+        except (
+            ValueError,
+            InvalidFrontmatterError,
+            InvalidContentError,
+            LoadError,
+        ) as e:
+            logger.warning("No Pagefind record for %s: %s", output, e)
+            continue
+        write_record(transcript, output, records_dir)
+        written += 1
+    return written
+
+
+def prune_records(out_dir: Path, records_dir: Path) -> int:
+    """Delete the records of pages under `out_dir` which no longer have an output.
+
+    Returns:
+        the number of records deleted
+
+    """
+    try:
+        section = page_url(out_dir / "index.html")
+    except ValueError:
+        # No records can have been written for it
+        return 0
+    live = {
+        record_path(records_dir, page_url(output))
+        for output in out_dir.glob("**/*.html")
+    }
+    removed = 0
+    for path in (records_dir / section.strip("/")).glob(f"**/*{RECORD_SUFFIX}"):
+        if path not in live:
+            logger.info("Removing Pagefind record %s (its output is gone)", path)
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,169 @@
+import json
+import os
+from datetime import UTC, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from .hugo_html import dump
+from .pagefind import (
+    make_record,
+    page_url,
+    prune_records,
+    record_path,
+    write_missing_records,
+    write_record,
+)
+from .transcript import Metadata, Transcript
+
+
+@pytest.fixture
+def transcript() -> Transcript:
+    return Transcript(
+        metadata=Metadata(
+            episode_title="Chapter 1: The Transdimensional Haboob",
+            series="Midnight Burger",
+            season=1,
+            date_published=datetime.fromisoformat("2020-10-27T18:01:00"),
+        ),
+        content=[
+            ("direction", "SFX: A DINER."),
+            ("character", "GLORIA:"),
+            ("dialogue", "Um... Hello?"),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    ("output", "url"),
+    [
+        (
+            "site/content/transcripts/season-1/chapter-1.html",
+            "/transcripts/season-1/chapter-1/",
+        ),
+        (
+            "site/content/transcripts/young-leif/part-7/index.html",
+            "/transcripts/young-leif/part-7/",
+        ),
+        (
+            "content/transcripts/Season-2/Chapter-3.html",
+            "/transcripts/season-2/chapter-3/",
+        ),
+        ("content/index.html", "/"),
+    ],
+)
+def test_page_url(tmp_path: Path, output: str, url: str):
+    assert page_url(tmp_path / output) == url
+
+
+def test_page_url_outside_content(tmp_path: Path):
+    with pytest.raises(ValueError, match="not in a Hugo content directory"):
+        page_url(tmp_path / "public" / "chapter-1.html")
+
+
+def test_make_record(transcript: Transcript):
+    assert make_record(transcript, "/transcripts/season-1/chapter-1/") == {
+        "url": "/transcripts/season-1/chapter-1/",
+        "content": "Midnight Burger\n"
+        "Chapter 1: The Transdimensional Haboob\n"
+        "SFX: A DINER.\n"
+        "GLORIA:\n"
+        "Um... Hello?",
+        "language": "en",
+        "meta": {"title": "Chapter 1: The Transdimensional Haboob"},
+        "filters": {"series": ["Midnight Burger"], "season": ["1"]},
+        "sort": {"date": "2020-10-27T18:01:00Z"},
+    }
+
+
+def test_make_record_without_metadata():
+    record = make_record(Transcript(content=[("dialogue", "Hello?")]), "/a/")
+
+    assert record["content"] == "Hello?"
+    assert record["meta"] == record["filters"] == record["sort"] == {}
+
+
+@pytest.mark.parametrize(
+    ("tzinfo", "date"),
+    [
+        (UTC, "2020-10-27T18:01:00Z"),
+        (timezone(timedelta(hours=-7)), "2020-10-27T18:01:00-07:00"),
+        (timezone(timedelta(hours=5, minutes=30)), "2020-10-27T18:01:00+05:30"),
+    ],
+)
+def test_make_record_date(transcript: Transcript, tzinfo: timezone, date: str):
+    assert transcript.metadata.date_published is not None
+    transcript.metadata.date_published = transcript.metadata.date_published.replace(
+        tzinfo=tzinfo
+    )
+
+    assert make_record(transcript, "/a/")["sort"] == {"date": date}
+
+
+def test_write_record(transcript: Transcript, tmp_path: Path):
+    output = tmp_path / "content" / "transcripts" / "season-1" / "chapter-1.html"
+    records = tmp_path / "records"
+
+    path = write_record(transcript, output, records)
+
+    assert path == records / "transcripts" / "season-1" / "chapter-1.json"
+    record = json.loads(path.read_text(encoding="utf-8"))
+    assert record == make_record(transcript, "/transcripts/season-1/chapter-1/")
+
+
+def test_write_record_unchanged(transcript: Transcript, tmp_path: Path):
+    output = tmp_path / "content" / "chapter-1.html"
+    records = tmp_path / "records"
+    path = write_record(transcript, output, records)
+    mtime = path.stat().st_mtime_ns - 1_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+    write_record(transcript, output, records)
+    assert path.stat().st_mtime_ns == mtime
+
+    transcript.metadata.season = 2
+    write_record(transcript, output, records)
+    assert path.stat().st_mtime_ns != mtime
+
+
+def test_write_missing_records(transcript: Transcript, tmp_path: Path):
+    content = tmp_path / "content"
+    records = tmp_path / "records"
+    outputs = [content / "chapter-1.html", content / "chapter-2.html"]
+    for output in outputs:
+        dump(transcript, output)
+    existing = write_record(Transcript(), outputs[0], records)
+    before = existing.read_bytes()
+
+    assert write_missing_records(outputs, records) == 1
+
+    assert existing.read_bytes() == before
+    record = json.loads(record_path(records, "/chapter-2/").read_text("utf-8"))
+    assert record == make_record(transcript, "/chapter-2/")
+
+
+def test_write_missing_records_skips_invalid_outputs(tmp_path: Path):
+    output = tmp_path / "content" / "chapter-1.html"
+    output.parent.mkdir()
+    output.write_text("not a transcript")
+
+    assert write_missing_records([output], tmp_path / "records") == 0
+
+
+def test_prune_records(transcript: Transcript, tmp_path: Path):
+    content = tmp_path / "content"
+    records = tmp_path / "records"
+    kept = content / "transcripts" / "chapter-1.html"
+    dump(transcript, kept)
+    kept_record = write_record(transcript, kept, records)
+    removed_record = write_record(
+        transcript, content / "transcripts" / "chapter-2.html", records
+    )
+    # Outside the directory being pruned
+    other_record = write_record(transcript, content / "about.html", records)
+
+    assert prune_records(content / "transcripts", records) == 1
+
+    assert kept_record.exists()
+    assert not removed_record.exists()
+    assert other_record.exists()
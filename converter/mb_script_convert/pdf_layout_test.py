@@ -0,0 +1,58 @@
+import random
+
+import pytest
+from pdfminer.layout import LAParams, LTChar, LTPage, LTTextBox
+
+from .pdf_layout import analyse_page
+
+PAGE_BBOX = (0, 0, 612, 792)
+
+
+def _char(x0: float, y0: float, text: str, width: float = 7.2) -> LTChar:
+    # Skip LTChar's constructor, which needs a font and a text matrix
+    char = LTChar.__new__(LTChar)
+    char.set_bbox((x0, y0, x0 + width, y0 + 12))
+    char._text = text
+    char.fontname = "Courier"
+    return char
+
+
+def _page(chars: list[LTChar]) -> LTPage:
+    page = LTPage(1, PAGE_BBOX)
+    for char in chars:
+        page.add(char)
+    return page
+
+
+def _random_chars(seed: int) -> list[LTChar]:
+    rng = random.Random(seed)
+    chars = []
+    y = 740.0
+    while y > 0:
+        x = rng.choice([108.0, 144.0, 300.0, 520.0, rng.uniform(-50, 650)])
+        for _ in range(rng.randint(1, 30)):
+            text = rng.choice("abc ABC()'.-")
+            width = rng.choice([7.2, 7.2, 7.2, 0.0, 3.0])
+            chars.append(_char(x, y + rng.choice([0, 0, 0, 0.5, 8]), text, width))
+            x += width + rng.choice([0, 0, 0, 1, 4, 20])
+        y -= rng.choice([12, 12, 13, 18, 24, 36])
+        if rng.random() < 0.1:  # noqa: PLR2004
+            y = rng.uniform(-20, 820)
+            if y > 800:  # noqa: PLR2004
+                break
+    return chars
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_analyse_page_matches_pdfminer(seed: int):
+    reference = _page(_random_chars(seed))
+    reference.analyze(LAParams(boxes_flow=None))
+    expected = [
+        (box.get_text(), box.bbox) for box in reference if isinstance(box, LTTextBox)
+    ]
+
+    boxes = analyse_page(_page(_random_chars(seed)))
+
+    assert [(box.get_text(), (box.x0, box.y0, box.x1, box.y1)) for box in boxes] == (
+        expected
+    )
@@ -2,22 +2,65 @@ from __future__ import annotations
 
 import re
 from math import isclose
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
+from weakref import WeakKeyDictionary
 
+import numpy as np
 from py_pdf_parser.common import BoundingBox
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Sequence
 
+    from py_pdf_parser.components import PDFDocument
     from py_pdf_parser.filtering import PDFElement
 
+# Thresholds for the top right corner of the page, where the page numbers are.
+# Despite the names these aren't the middle of the page; see `page_geometry` for
+# that.
 PAGE_X_CENTER = 500
 PAGE_Y_CENTER = 740
+# How far, in points, an element can be from an indent and still be at it
+INDENT_TOLERANCE = 10
+
+
+class PageGeometry(NamedTuple):
+    width: float
+    height: float
+    x_center: float
+    y_center: float
+    bounding_box: BoundingBox
+
+
+_page_geometries: WeakKeyDictionary[PDFDocument, dict[int, PageGeometry]] = (
+    WeakKeyDictionary()
+)
+
+
+def page_geometry(element: PDFElement) -> PageGeometry:
+    """Get the dimensions of the page an element is on.
+
+    These are worked out once for every page in the document, the first time
+    they're needed.
+    """
+    document = element.document
+    geometries = _page_geometries.get(document)
+    if geometries is None:
+        geometries = {
+            page.page_number: PageGeometry(
+                width=page.width,
+                height=page.height,
+                x_center=page.width / 2,
+                y_center=page.height / 2,
+                bounding_box=BoundingBox(0, page.width, 0, page.height),
+            )
+            for page in document.pages
+        }
+        _page_geometries[document] = geometries
+    return geometries[element.page_number]
 
 
 def is_centered(element: PDFElement) -> bool:
-    page = element.document.get_page(element.page_number)
-    page_middle = page.width / 2
+    page_middle = page_geometry(element).x_center
 
     bbox = element.bounding_box
     el_middle = (bbox.x0 + bbox.x1) / 2
@@ -32,14 +75,46 @@ def is_in_top_right(element: PDFElement) -> bool:
 
 
 def is_off_page(element: PDFElement) -> bool:
-    page = element.document.get_page(element.page_number)
-    page_bb = BoundingBox(0, page.width, 0, page.height)
-    return not element.partially_within(page_bb)
+    return not element.partially_within(page_geometry(element).bounding_box)
+
+
+class ElementArrays:
+    """The bounding boxes of a list of elements, as NumPy arrays.
+
+    The methods mirror the element predicates in this module, but test every
+    element at once and return a boolean mask.
+    """
+
+    def __init__(self, elements: Sequence[PDFElement]):
+        self.elements = list(elements)
+        rows = []
+        for el in self.elements:
+            bbox, page = el.bounding_box, page_geometry(el)
+            rows.append((bbox.x0, bbox.x1, bbox.y0, bbox.y1, page.width, page.height))
+        boxes = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        self.x0, self.x1, self.y0, self.y1, self.page_width, self.page_height = boxes.T
+
+    def is_in_top_right(self) -> np.ndarray:
+        return (self.x0 >= PAGE_X_CENTER) & (self.y0 >= PAGE_Y_CENTER)
+
+    def is_off_page(self) -> np.ndarray:
+        return ~(
+            (self.x1 >= 0)
+            & (self.page_width >= self.x0)
+            & (self.y1 >= 0)
+            & (self.page_height >= self.y0)
+        )
+
+    def by_indent(self, indent: float | int) -> np.ndarray:
+        return np.abs(self.x0 - indent) <= INDENT_TOLERANCE
+
+    def select(self, mask: np.ndarray) -> list[PDFElement]:
+        return [self.elements[i] for i in np.flatnonzero(mask)]
 
 
 def by_indent(indent: float | int) -> Callable[[PDFElement], bool]:
     def predicate(element: PDFElement) -> bool:
-        return isclose(element.bounding_box.x0, indent, abs_tol=10)
+        return isclose(element.bounding_box.x0, indent, abs_tol=INDENT_TOLERANCE)
 
     return predicate
 
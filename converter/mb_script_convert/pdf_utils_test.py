@@ -0,0 +1,58 @@
+from .conftest import CHAR_WIDTH, PAGE_HEIGHT, PAGE_WIDTH, MakeDocument
+from .pdf_utils import (
+    ElementArrays,
+    by_indent,
+    is_centered,
+    is_in_top_right,
+    is_off_page,
+    page_geometry,
+)
+
+
+def test_page_geometry(make_document: MakeDocument):
+    pdf = make_document({1: [(108, 700, "foo")], 2: [(108, 700, "bar")]})
+
+    geometry = page_geometry(pdf.elements[0])
+    assert (geometry.width, geometry.height) == (PAGE_WIDTH, PAGE_HEIGHT)
+    assert (geometry.x_center, geometry.y_center) == (PAGE_WIDTH / 2, PAGE_HEIGHT / 2)
+    assert page_geometry(pdf.elements[1]) == geometry
+
+
+def test_predicates(make_document: MakeDocument):
+    pdf = make_document(
+        {
+            1: [
+                (PAGE_WIDTH / 2 - 4 * CHAR_WIDTH, 400, "centered"),
+                (108, 400, "left"),
+                (520, 750, "2."),
+                (108, PAGE_HEIGHT + 100, "off page"),
+            ]
+        }
+    )
+    elements = {el.text(): el for el in pdf.elements}
+
+    assert {text for text, el in elements.items() if is_centered(el)} == {"centered"}
+    assert {text for text, el in elements.items() if is_in_top_right(el)} == {"2."}
+    assert {text for text, el in elements.items() if is_off_page(el)} == {"off page"}
+
+
+def test_element_arrays_match_predicates(make_document: MakeDocument):
+    pdf = make_document(
+        {
+            1: [
+                (98, 700, "just inside the indent"),
+                (97.9, 680, "just outside the indent"),
+                (118, 660, "other side of the indent"),
+                (500, 740, "top right"),
+                (-100, 600, "partly off page"),
+                (PAGE_WIDTH + 1, 600, "off page"),
+            ]
+        }
+    )
+    arrays = ElementArrays(pdf.elements)
+
+    assert arrays.by_indent(108).tolist() == [by_indent(108)(el) for el in pdf.elements]
+    assert arrays.is_in_top_right().tolist() == [
+        is_in_top_right(el) for el in pdf.elements
+    ]
+    assert arrays.is_off_page().tolist() == [is_off_page(el) for el in pdf.elements]
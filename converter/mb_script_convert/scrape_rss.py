@@ -1,20 +1,26 @@
+import asyncio
 import logging
-from collections.abc import Sequence
+import re
+from collections.abc import Iterable, Sequence
 from dataclasses import fields
 from datetime import datetime
-from time import mktime
+from time import mktime, time
 from urllib.parse import urlparse
 
 import feedparser
+import numpy as np
 from adaptix import P, Retort, loader, name_mapping
 from feedparser import FeedParserDict
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
-from .feeds_cache import cache
+from .feeds_cache import get_cache
+from .fetch_feeds import fetch_feeds
 from .transcript import Metadata, Transcript
 
 logger = logging.getLogger(__name__)
 
+MB_RSS_URL = "https://rss.art19.com/midnight-burger"
+
 retort = Retort(
     recipe=[
         name_mapping(
@@ -35,17 +41,99 @@ retort = Retort(
 )
 
 
-def scrape_episode_metadata(transcript: Transcript, url_file_stream_or_string):
+class FeedSession:
+    """Shares fetched feeds between the conversions in a batch.
+
+    Each feed is fetched, or revalidated against the cache, the first time it
+    is asked for. After that the parsed feed is reused until `ttl` seconds have
+    passed, or for the lifetime of the session if `ttl` is None. Sessions can be
+    pickled, so a prefetched session can be handed to worker processes.
+
+    Episodes can be matched against several feeds at once, such as the main
+    feed and a bonus feed, by passing a list of URLs instead of one.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self.feeds: dict[str, tuple[float, FeedParserDict | None]] = {}
+        self.indexes: dict[
+            str | tuple[str, ...], tuple[tuple[FeedParserDict, ...], "TitleIndex"]
+        ] = {}
+
+    def get(self, url_file_stream_or_string) -> FeedParserDict | None:
+        if not isinstance(url_file_stream_or_string, str):
+            # streams can only be read once, so there's nothing to share
+            return _get_feed(url_file_stream_or_string)
+        url: str = url_file_stream_or_string
+
+        now = time()
+        if self._is_stale(url, now):
+            self.feeds[url] = (now, _get_feed(url))
+        return self.feeds[url][1]
+
+    def get_many(self, urls: Sequence[str]) -> list[FeedParserDict | None]:
+        """Get several feeds, fetching the ones which are due all at once."""
+        now = time()
+        stale = [url for url in dict.fromkeys(urls) if self._is_stale(url, now)]
+        if len(stale) == 1:
+            self.get(stale[0])
+        elif stale:
+            for url, feed in _get_feeds(stale).items():
+                self.feeds[url] = (now, feed)
+        return [self.feeds[url][1] for url in urls]
+
+    def _is_stale(self, url: str, now: float) -> bool:
+        fetched = self.feeds.get(url)
+        return fetched is None or (self.ttl is not None and now - fetched[0] > self.ttl)
+
+    def get_index(self, url_file_stream_or_string) -> "TitleIndex | None":
+        """Get a `TitleIndex` for the feeds, reusing it until a feed changes."""
+        if isinstance(url_file_stream_or_string, list | tuple):
+            key = tuple(url_file_stream_or_string)
+            if not key:
+                logger.warning("No RSS feeds were given. Cannot scrape metadata")
+                return None
+            feeds = [feed for feed in self.get_many(key) if feed is not None]
+            if not feeds:
+                return None
+        else:
+            feed = self.get(url_file_stream_or_string)
+            if feed is None:
+                return None
+            if not isinstance(url_file_stream_or_string, str):
+                return TitleIndex(feed.entries)
+            key = url_file_stream_or_string
+            feeds = [feed]
+
+        indexed = self.indexes.get(key)
+        if indexed is None or not _same_feeds(indexed[0], feeds):
+            entries = feeds[0].entries if len(feeds) == 1 else merge_entries(feeds)
+            indexed = (tuple(feeds), TitleIndex(entries))
+            self.indexes[key] = indexed
+        return indexed[1]
+
+
+def _same_feeds(a: Sequence[FeedParserDict], b: Sequence[FeedParserDict]) -> bool:
+    return len(a) == len(b) and all(x is y for x, y in zip(a, b, strict=True))
+
+
+def scrape_episode_metadata(
+    transcript: Transcript,
+    url_file_stream_or_string,
+    session: FeedSession | None = None,
+):
     ep_title = transcript.metadata.episode_title
     assert ep_title is not None, (
         "Cannot scrape episode metadata when episode title is not set"
     )
 
-    feed = _get_feed(url_file_stream_or_string)
-    if feed is None:
+    if session is None:
+        session = FeedSession()
+    index = session.get_index(url_file_stream_or_string)
+    if index is None:
         return
 
-    episode = _match_episode(ep_title, feed)
+    episode = index.match(ep_title)
     if episode is None:
         return
 
@@ -60,90 +148,123 @@ def scrape_episode_metadata(transcript: Transcript, url_file_stream_or_string):
 
 
 def _get_feed(url_file_stream_or_string) -> FeedParserDict | None:
-    looks_like_url = isinstance(url_file_stream_or_string, str) and urlparse(
+    if not _looks_like_url(url_file_stream_or_string):
+        return feedparser.parse(url_file_stream_or_string)
+    return _get_feeds([url_file_stream_or_string])[url_file_stream_or_string]
+
+
+def _get_feeds(urls: Sequence[str]) -> dict[str, FeedParserDict | None]:
+    """Fetch several feeds at once, through the cache if they are URLs."""
+    feeds = {url: _get_feed(url) for url in urls if not _looks_like_url(url)}
+    remote = [url for url in urls if url not in feeds]
+    if remote:
+        feeds.update(asyncio.run(fetch_feeds(remote, get_cache())))
+    return feeds
+
+
+def _looks_like_url(url_file_stream_or_string) -> bool:
+    return isinstance(url_file_stream_or_string, str) and urlparse(
         url_file_stream_or_string
     )[0] in {"http", "https"}
-    if not looks_like_url:
-        return feedparser.parse(url_file_stream_or_string)
-    url: str = url_file_stream_or_string
-
-    if url not in cache:
-        cache[url] = feedparser.parse(url)
-        match cache[url].status:
-            case 200 | 302:
-                # all good
-                pass
-            case 301:
-                logger.warning(
-                    "HTTP response 301: %s has permanently moved to %s",
-                    url,
-                    cache[url].href,
-                )
-            case _:
-                logger.warning(
-                    "Something went wrong fetching %s (status %s). Cannot scrape metadata",
-                    url,
-                    cache[url].status,
-                )
-                return
-    else:
-        cached_feed = cache[url]
-        new_feed = feedparser.parse(
-            url, etag=cached_feed.get("etag"), modified=cached_feed.get("modified")
-        )
-        match new_feed.status:
-            case 200 | 302:
-                cache[url] = new_feed
-            case 304:
-                # the feed has not been modified
-                pass
-            case 301:
-                logger.warning(
-                    "HTTP response 301: %s has permanently moved to %s",
-                    url,
-                    new_feed.href,
-                )
-                cache[url] = new_feed
-            case _:
-                logger.warning(
-                    "Something went wrong fetching %s (status %s). Using cached feed.",
-                    url,
-                    new_feed.status,
-                )
-
-    return cache[url]
+
+
+def merge_entries(feeds: Iterable[FeedParserDict]) -> list[FeedParserDict]:
+    """Combine the entries of several feeds, keeping the first copy of each episode.
+
+    Entries are the same episode if they share an id, or failing that a title,
+    so a mirror of a feed adds nothing that is already in an earlier feed.
+    """
+    entries = {}
+    for feed in feeds:
+        for entry in feed.entries:
+            entries.setdefault(entry.get("id") or entry.get("title"), entry)
+    return list(entries.values())
 
 
 SIMILARITY_THRESHOLD = 85
 
+NUMBERED_TITLE = re.compile(r"\b(chapter|part)\s+(\d+)\b")
 
-def _match_episode(ep_title: str, feed: FeedParserDict) -> FeedParserDict | None:
-    most_similar = (0, None)
-    matches: list[FeedParserDict] = []
-    for entry in feed.entries:
-        # partial ratio
-        ratio = fuzz.partial_ratio(ep_title, entry.title)
-        if ratio > most_similar[0]:
-            most_similar = (ratio, entry)
-        if ratio > SIMILARITY_THRESHOLD:
-            matches.append(entry)
-    assert most_similar[1] is not None
-    if len(matches) > 0:
-        if len(matches) == 1:
-            result = matches[0]
-        else:
-            ratios = [fuzz.ratio(ep_title, e.title) for e in matches]
-            result = matches[_argmax(ratios)]
-        logger.info("Matched episode '%s' in RSS feed", result.title)
-        return result
-    else:
-        logger.warning("Could not find entry matching '%s'", ep_title)
-        logger.warning(
-            "The most similar title is %s (similarity %s)",
-            most_similar[1].title,
-            most_similar[0],
+
+def _normalise_title(title: str) -> str:
+    return " ".join(title.replace("’", "'").casefold().split())
+
+
+def _title_keys(title: str) -> frozenset[tuple[str, int]]:
+    return frozenset(
+        (kind, int(number)) for kind, number in NUMBERED_TITLE.findall(title)
+    )
+
+
+class TitleIndex:
+    """Matches episode titles against the entries of a feed.
+
+    The titles are scored with `fuzz.partial_ratio` in a single vectorised
+    call. Entries scoring above SIMILARITY_THRESHOLD match, and if several do,
+    the one with the best `fuzz.ratio` is chosen.
+
+    Chapter and part numbers are pulled out of the normalised titles as exact
+    keys. If an episode title has one, only the entries with the same number are
+    considered. This stops "Chapter 3" from matching "Chapter 38". If none of
+    those entries match, all of the entries are considered.
+    """
+
+    def __init__(self, entries: Sequence[FeedParserDict]):
+        self.entries = list(entries)
+        self.titles = [entry.title for entry in self.entries]
+        self.normalised_titles = [_normalise_title(t) for t in self.titles]
+        self.keys: dict[tuple[str, int], list[int]] = {}
+        for i, title in enumerate(self.normalised_titles):
+            for key in _title_keys(title):
+                self.keys.setdefault(key, []).append(i)
+
+    def match(self, ep_title: str) -> FeedParserDict | None:
+        if len(self.entries) == 0:
+            logger.warning("The feed has no entries to match against")
+            return None
+        scores = process.cdist(
+            [ep_title],
+            self.titles,
+            scorer=fuzz.partial_ratio,
+            dtype=np.float64,
+            workers=-1,
+        )
+        return self._select(ep_title, scores[0])
+
+    def _select(self, ep_title: str, scores: np.ndarray) -> FeedParserDict | None:
+        candidates = sorted(
+            {
+                i
+                for key in _title_keys(_normalise_title(ep_title))
+                for i in self.keys.get(key, ())
+            }
         )
-        logger.warning("Set the correct title with the --episode-title flag")
+        matches = [i for i in candidates if scores[i] > SIMILARITY_THRESHOLD]
+        if len(matches) == 0:
+            matches = np.flatnonzero(scores > SIMILARITY_THRESHOLD).tolist()
+
+        if len(matches) > 0:
+            if len(matches) == 1:
+                result = self.entries[matches[0]]
+            else:
+                ratios = [fuzz.ratio(ep_title, self.titles[i]) for i in matches]
+                result = self.entries[matches[_argmax(ratios)]]
+            logger.info("Matched episode '%s' in RSS feed", result.title)
+            return result
+        else:
+            most_similar = int(np.argmax(scores))
+            logger.warning("Could not find entry matching '%s'", ep_title)
+            logger.warning(
+                "The most similar title is %s (similarity %s)",
+                self.titles[most_similar],
+                scores[most_similar],
+            )
+            logger.warning("Set the correct title with the --episode-title flag")
+            return None
+
+
+def _match_episode(ep_title: str, feed: FeedParserDict) -> FeedParserDict | None:
+    return TitleIndex(feed.entries).match(ep_title)
 
 
 def _argmax(a: Sequence[float]):
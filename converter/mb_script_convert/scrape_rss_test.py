@@ -1,6 +1,8 @@
+import pytest
 from feedparser import FeedParserDict
 
-from .scrape_rss import _match_episode
+from . import scrape_rss
+from .scrape_rss import FeedSession, TitleIndex, _match_episode
 
 
 class TestMatchEpisode:
@@ -33,3 +35,91 @@ class TestMatchEpisode:
 
         result2 = _match_episode("Part 1: Relentless Rick", self.FAKE_FEED)
         assert result2 == self.ENTRIES[4]
+
+    def test_no_match(self):
+        assert _match_episode("Something Else Entirely", self.FAKE_FEED) is None
+
+
+class TestTitleIndex:
+    ENTRIES = (
+        {"title": "Chapter 38: Welcome to the Triad"},
+        {"title": "Chapter 3: Welcome to the Triad"},
+        {"title": "Young Leif Part 1: Bertiluna"},
+    )
+
+    INDEX = TitleIndex([FeedParserDict(e) for e in ENTRIES])
+
+    def test_numbers_are_exact(self):
+        assert self.INDEX.match("Chapter 3: Welcome to the Triad") == self.ENTRIES[1]
+        assert self.INDEX.match("Chapter 38: Welcome to the Triad") == self.ENTRIES[0]
+
+    def test_match(self):
+        assert self.INDEX.match("Part 1: Bertiluna") == self.ENTRIES[2]
+        assert self.INDEX.match("Something Else Entirely") is None
+
+
+@pytest.fixture
+def fetches(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    fetches = []
+
+    def fake_get_feed(url):
+        fetches.append(url)
+        return FeedParserDict({"entries": []})
+
+    monkeypatch.setattr(scrape_rss, "_get_feed", fake_get_feed)
+    return fetches
+
+
+class TestFeedSession:
+    URL = "https://example.com/feed"
+
+    def test_fetches_once(self, fetches: list[str]):
+        session = FeedSession()
+        feed = session.get(self.URL)
+        assert session.get(self.URL) is feed
+        assert fetches == [self.URL]
+
+    def test_ttl(self, fetches: list[str], monkeypatch: pytest.MonkeyPatch):
+        session = FeedSession(ttl=60)
+        monkeypatch.setattr(scrape_rss, "time", lambda: 1000)
+        session.get(self.URL)
+        monkeypatch.setattr(scrape_rss, "time", lambda: 1030)
+        session.get(self.URL)
+        assert fetches == [self.URL]
+        monkeypatch.setattr(scrape_rss, "time", lambda: 1061)
+        session.get(self.URL)
+        assert fetches == [self.URL, self.URL]
+
+    def test_several_feeds(self, monkeypatch: pytest.MonkeyPatch):
+        main = FeedParserDict(
+            entries=[
+                FeedParserDict(id="1", title="Chapter 1: The Transdimensional Haboob")
+            ]
+        )
+        bonus = FeedParserDict(
+            entries=[
+                FeedParserDict(id="1", title="Chapter 1: The Transdimensional Haboob"),
+                FeedParserDict(id="2", title="Shift Notes: Young Leif"),
+            ]
+        )
+        fetched = []
+
+        def fake_get_feeds(urls):
+            fetched.append(urls)
+            return dict(zip(urls, [main, bonus], strict=True))
+
+        monkeypatch.setattr(scrape_rss, "_get_feeds", fake_get_feeds)
+        session = FeedSession()
+        urls = [self.URL, "https://example.com/bonus"]
+
+        index = session.get_index(urls)
+        assert index is not None
+        assert index.entries == [main.entries[0], bonus.entries[1]]
+        assert session.get_index(urls) is index
+        assert fetched == [urls]
+
+
+def test_no_feeds(fetches: list[str], caplog: pytest.LogCaptureFixture):
+    assert FeedSession().get_index(()) is None
+    assert fetches == []
+    assert "No RSS feeds were given" in caplog.text
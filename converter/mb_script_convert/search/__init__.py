@@ -0,0 +1,6 @@
+"""Search the lines of every transcript, by words, phrases and speaker.
+
+The index is kept in the cache directory, with a segment file per transcript
+which is memory-mapped when searched. Run `python -m mb_script_convert.search`
+to query it from the command line.
+"""
@@ -0,0 +1,68 @@
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from .index import Hit, SearchIndex
+
+logger = logging.getLogger(__name__)
+
+parser = argparse.ArgumentParser(
+    prog="python -m mb_script_convert.search",
+    description="Find lines in the converted transcripts. Every word and"
+    ' "quoted phrase" in the query must appear in a line for it to match.',
+)
+parser.add_argument("ROOT", type=Path, help="The directory of transcripts to search")
+parser.add_argument("QUERY", nargs="?", default="")
+parser.add_argument(
+    "-c", "--character", help="Only match the lines spoken by this character"
+)
+parser.add_argument(
+    "-C",
+    "--context",
+    type=int,
+    default=1,
+    help="How many lines to show before and after each match",
+)
+parser.add_argument("-n", "--limit", type=int, help="Stop after this many matches")
+parser.add_argument(
+    "--index-dir", type=Path, help="Keep the index here instead of the cache"
+)
+
+
+def print_hit(hit: Hit):
+    title = f" {hit.title}" if hit.title else ""
+    print(f"{hit.key}:{hit.position}{title}")
+    for _, text in hit.before:
+        print(f"    {text}")
+    print(f"  > {hit.element[1]}")
+    for _, text in hit.after:
+        print(f"    {text}")
+
+
+if __name__ == "__main__":
+    args = parser.parse_intermixed_args()
+    if not args.QUERY and not args.character:
+        parser.error("give a query, a character, or both")
+    if not args.ROOT.is_dir():
+        parser.error(f"not a directory: {args.ROOT}")
+    logging.basicConfig(level=logging.INFO, format="{levelname}: {message}", style="{")
+
+    start = time.perf_counter()
+    index = SearchIndex(args.ROOT, args.index_dir)
+    index.load()
+    indexed = index.refresh()
+    if indexed:
+        logger.info("Indexed %d of %d transcripts", indexed, len(index.entries))
+
+    matches = 0
+    try:
+        for hit in index.search(args.QUERY, args.character, args.context):
+            if args.limit is not None and matches == args.limit:
+                break
+            print_hit(hit)
+            matches += 1
+    finally:
+        index.close()
+    index.save()
+    logger.info("%d matches in %.1f ms", matches, (time.perf_counter() - start) * 1000)
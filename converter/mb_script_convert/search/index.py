@@ -0,0 +1,200 @@
+"""An inverted index of every transcript in the output tree."""
+
+import hashlib
+import logging
+import os
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from adaptix.load_error import LoadError
+
+from ..cache_dir import CACHE_DIR, cache_key
+from ..hugo_html import InvalidContentError, InvalidFrontmatterError, load
+from ..json_store import changed_files, load_entries, save_entries
+from ..transcript import Element
+from .segment import VERSION, InvalidSegmentError, Segment, tokenize, write_segment
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = CACHE_DIR / "search-index"
+# Named for the segment format, so that segments in an older format are rebuilt
+MANIFEST_NAME = f"manifest-v{VERSION}.json"
+
+# Quoted phrases, or single words
+QUERY_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def index_dir_for(root: Path) -> Path:
+    """Pick a directory in the cache directory to hold the index of `root`."""
+    return INDEX_DIR / cache_key(root)
+
+
+def parse_query(query: str) -> list[list[str]]:
+    """Split a query into phrases of tokens, where "quoted words" are one phrase."""
+    phrases = []
+    for match in QUERY_TERM.finditer(query):
+        phrase = tokenize(
+            match.group(1) if match.group(1) is not None else match.group(2)
+        )
+        if phrase:
+            phrases.append(phrase)
+    return phrases
+
+
+@dataclass(frozen=True)
+class SegmentEntry:
+    mtime_ns: int
+    size: int
+    # The file name of the segment, or None if the transcript couldn't be read
+    segment: str | None
+    title: str | None = None
+
+
+@dataclass(frozen=True)
+class Hit:
+    """An element matching a query, with the elements around it."""
+
+    path: Path
+    # The path relative to the root of the index
+    key: str
+    title: str | None
+    position: int
+    speaker: str | None
+    before: list[Element]
+    element: Element
+    after: list[Element]
+
+
+class SearchIndex:
+    """Finds the elements of the transcripts under `root` containing some words.
+
+    Each transcript is indexed into its own `Segment`, which is only rebuilt
+    when the transcript's modification time or size has changed since the last
+    `refresh`.
+    """
+
+    def __init__(self, root: str | Path, index_dir: str | Path | None = None):
+        self.root = Path(root)
+        self.index_dir = (
+            index_dir_for(self.root) if index_dir is None else Path(index_dir)
+        )
+        self.manifest_file = self.index_dir / MANIFEST_NAME
+        self.entries: dict[str, SegmentEntry] = {}
+        self.modified = False
+        self._segments: dict[str, Segment] = {}
+
+    def load(self):
+        self.entries = load_entries(self.manifest_file, SegmentEntry, "index")
+
+    def save(self):
+        if not self.modified:
+            return
+        save_entries(self.manifest_file, self.entries)
+        self.modified = False
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the files under `root`.
+
+        Returns:
+            the number of transcripts which had to be indexed
+
+        """
+        changed, removed = changed_files(self.root, self.entries)
+        for key, path, st in changed:
+            self._index(key, path, st)
+        for key in removed:
+            self._remove_segment(key)
+            del self.entries[key]
+            self.modified = True
+        return len(changed)
+
+    def _index(self, key: str, path: Path, st: os.stat_result):
+        self._close_segment(key)
+        try:
+            transcript = load(path, pack=True)
+        except (InvalidFrontmatterError, InvalidContentError, LoadError) as e:
+            logger.warning("Not indexing %s: %s", path, e)
+            self._remove_segment(key)
+            self.entries[key] = SegmentEntry(st.st_mtime_ns, st.st_size, None)
+        else:
+            segment = self._segment_name(key)
+            write_segment(transcript, self.index_dir / segment)
+            self.entries[key] = SegmentEntry(
+                st.st_mtime_ns, st.st_size, segment, transcript.metadata.episode_title
+            )
+        self.modified = True
+
+    def _remove_segment(self, key: str):
+        self._close_segment(key)
+        (self.index_dir / self._segment_name(key)).unlink(missing_ok=True)
+
+    def _close_segment(self, key: str):
+        segment = self._segments.pop(key, None)
+        if segment is not None:
+            segment.close()
+
+    def close(self):
+        """Close every segment opened by searching."""
+        for key in list(self._segments):
+            self._close_segment(key)
+
+    @staticmethod
+    def _segment_name(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()[:16] + ".seg"
+
+    def segment(self, key: str) -> Segment | None:
+        """Open the segment of a transcript, if it has one."""
+        if key in self._segments:
+            return self._segments[key]
+        entry = self.entries.get(key)
+        if entry is None or entry.segment is None:
+            return None
+        try:
+            segment = Segment(self.index_dir / entry.segment)
+        except (FileNotFoundError, InvalidSegmentError) as e:
+            # Rebuild it on the next refresh
+            logger.warning("Missing or invalid segment for %s: %s", key, e)
+            self.entries[key] = SegmentEntry(-1, -1, None)
+            self.modified = True
+            return None
+        self._segments[key] = segment
+        return segment
+
+    def search(
+        self, query: str, character: str | None = None, context: int = 1
+    ) -> Iterator[Hit]:
+        """Find the elements matching a query, in order of file and position.
+
+        Every word and quoted phrase in the query must appear in an element for
+        it to match. An empty query matches everything.
+
+        Args:
+            query: the words and phrases to find
+            character: only match the lines spoken by this character
+            context: how many elements to include before and after each match
+
+        """
+        phrases = parse_query(query)
+        for key in sorted(self.entries):
+            segment = self.segment(key)
+            if segment is None:
+                continue
+            path = self.root / key
+            title = self.entries[key].title
+            content = segment.content
+            for position in segment.find(phrases, character):
+                # Indexed one at a time, as slicing would copy the content
+                before = range(max(position - context, 0), position)
+                after = range(position + 1, min(position + 1 + context, len(content)))
+                yield Hit(
+                    path=path,
+                    key=key,
+                    title=title,
+                    position=position,
+                    speaker=segment.speaker(position),
+                    before=[content[i] for i in before],
+                    element=content[position],
+                    after=[content[i] for i in after],
+                )
@@ -0,0 +1,143 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ..hugo_html import dump
+from ..transcript import Metadata, Transcript
+from .index import SearchIndex, parse_query
+
+# The number of transcripts written by the `root` fixture
+TRANSCRIPTS = 2
+
+
+def write_transcript(path: Path, title: str, *lines: tuple[str, str]):
+    dump(Transcript(Metadata(episode_title=title), list(lines)), path)
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    root = tmp_path / "transcripts"
+    write_transcript(
+        root / "season-1" / "chapter-1.html",
+        "Chapter 1",
+        ("character", "GLORIA:"),
+        ("dialogue", "Um... Hello?"),
+        ("character", "CASPAR:"),
+        ("dialogue", "Welcome to Midnight Burger!"),
+    )
+    write_transcript(
+        root / "season-1" / "chapter-2.html",
+        "Chapter 2",
+        ("direction", "A BELL RINGS."),
+        ("character", "CASPAR:"),
+        ("dialogue", "Hello, welcome to Midnight Burger!"),
+    )
+    return root
+
+
+def test_parse_query():
+    assert parse_query('hello "Midnight Burger" I’m') == [
+        ["hello"],
+        ["midnight", "burger"],
+        ["i'm"],
+    ]
+    assert parse_query('"" ...') == []
+
+
+def test_search(root: Path, tmp_path: Path):
+    index = SearchIndex(root, tmp_path / "index")
+    index.load()
+    assert index.refresh() == TRANSCRIPTS
+
+    hits = list(index.search('"midnight burger" welcome'))
+    assert [(hit.path, hit.position) for hit in hits] == [
+        (root / "season-1" / "chapter-1.html", 3),
+        (root / "season-1" / "chapter-2.html", 2),
+    ]
+    assert hits[0].title == "Chapter 1"
+    assert hits[0].speaker == "CASPAR"
+    assert hits[0].before == [("character", "CASPAR:")]
+    assert hits[0].element == ("dialogue", "Welcome to Midnight Burger!")
+    assert hits[0].after == []
+
+
+def test_search_character(root: Path, tmp_path: Path):
+    index = SearchIndex(root, tmp_path / "index")
+    index.refresh()
+
+    hits = list(index.search("hello", character="Gloria", context=0))
+
+    assert [(hit.path.name, hit.position) for hit in hits] == [("chapter-1.html", 1)]
+    assert hits[0].before == hits[0].after == []
+
+
+def test_refresh_is_incremental(root: Path, tmp_path: Path):
+    index = SearchIndex(root, tmp_path / "index")
+    index.refresh()
+    index.save()
+
+    index = SearchIndex(root, tmp_path / "index")
+    index.load()
+    assert index.refresh() == 0
+    assert not index.modified
+
+    changed = root / "season-1" / "chapter-2.html"
+    write_transcript(changed, "Chapter 2", ("dialogue", "Goodbye"))
+    st = changed.stat()
+    os.utime(changed, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    (root / "season-1" / "chapter-1.html").unlink()
+    assert index.refresh() == 1
+
+    assert [hit.path for hit in index.search("goodbye")] == [changed]
+    assert list(index.search("hello")) == []
+    assert len(list((tmp_path / "index").glob("*.seg"))) == 1
+
+
+def test_skips_invalid(root: Path, tmp_path: Path):
+    (root / "broken.html").write_text("not a transcript", encoding="utf-8")
+    index = SearchIndex(root, tmp_path / "index")
+
+    assert index.refresh() == TRANSCRIPTS + 1
+    assert index.entries["broken.html"].segment is None
+    assert len(list(index.search("hello"))) == TRANSCRIPTS
+
+
+def test_rebuilds_missing_segments(root: Path, tmp_path: Path):
+    index = SearchIndex(root, tmp_path / "index")
+    index.refresh()
+    for segment in (tmp_path / "index").glob("*.seg"):
+        segment.unlink()
+
+    assert list(index.search("hello")) == []
+    assert index.refresh() == TRANSCRIPTS
+    assert len(list(index.search("hello"))) == TRANSCRIPTS
+
+
+@pytest.mark.parametrize(
+    "manifest",
+    ['{"a.html": {"mtime_ns": 0, "size": 0}}', '{"a.html": 1}', "[]", "{"],
+)
+def test_rebuilds_corrupt_manifest(root: Path, tmp_path: Path, manifest: str):
+    index = SearchIndex(root, tmp_path / "index")
+    index.refresh()
+    index.save()
+    index.manifest_file.write_text(manifest, encoding="utf-8")
+
+    index = SearchIndex(root, tmp_path / "index")
+    index.load()
+    assert index.entries == {}
+    assert index.refresh() == TRANSCRIPTS
+
+
+def test_closes_dropped_segments(root: Path, tmp_path: Path):
+    index = SearchIndex(root, tmp_path / "index")
+    index.refresh()
+    list(index.search("hello"))
+    segment = index.segment("season-1/chapter-1.html")
+    assert segment is not None
+
+    (root / "season-1" / "chapter-1.html").unlink()
+    index.refresh()
+    with pytest.raises(ValueError, match="released"):
+        segment.content[0]
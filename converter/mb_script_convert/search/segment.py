@@ -0,0 +1,379 @@
+"""The part of the search index covering one transcript, as a memory-mappable file.
+
+A segment holds the content of the transcript, packed as in `PackedContent`,
+along with the speaker of each element and the positions of every token. The
+file is laid out as sections, each starting on an 8 byte boundary:
+
+- a header of counts and lengths
+- the names of the characters, as JSON
+- the content's tags, text offsets and text
+- the speaker of each element, as an index into the characters
+- the offset of each character's postings, and then the postings themselves,
+  as the elements they speak
+- the sorted vocabulary of tokens, as offsets into a UTF-8 buffer
+- the offset of each token's postings, and then the postings themselves, as
+  pairs of element and position
+
+Opening a segment only reads the header and the characters; everything else is
+read from the mapped file when a query needs it, until the segment is closed. Integers are stored in the
+byte order of the machine, since a segment is only a cache of the transcript.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Self
+
+from ..transcript import PackedContent, Transcript, padding
+
+MAGIC = b"MBSI"
+VERSION = 2
+# magic, version, big endian, number of elements, text length, characters
+# length, number of characters, number of spoken elements, number of tokens,
+# vocabulary length, number of postings
+HEADER = struct.Struct("<4sHBxIIIIIIII")
+NO_SPEAKER = 0xFFFF
+# The sizes of the arrays' items
+END_SIZE = array("Q").itemsize
+SPEAKER_SIZE = array("H").itemsize
+OFFSET_SIZE = array("I").itemsize
+
+TOKEN = re.compile(r"\w+(?:['’]\w+)*")
+# A character's name, without the trailing colon or any (CONT'D)
+SPEAKER = re.compile(r"^(.*?)\s*:?\s*(?:\(.*)?$")
+
+type Posting = tuple[int, int]
+
+
+class InvalidSegmentError(Exception):
+    pass
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower case words, keeping contractions whole."""
+    return [
+        match.group().casefold().replace("’", "'") for match in TOKEN.finditer(text)
+    ]
+
+
+def speaker_name(text: str) -> str:
+    """Get the name a character element refers to, such as GLORIA for "Gloria: (CONT'D)"."""
+    match = SPEAKER.match(text.strip())
+    assert match is not None
+    return match.group(1).upper()
+
+
+def _speakers(content: Iterable[tuple[str, str]]) -> tuple[list[str], array]:
+    """Find who speaks each element: the character before a run of dialogue."""
+    characters: dict[str, int] = {}
+    speakers = array("H")
+    current = NO_SPEAKER
+    for tag, text in content:
+        match tag:
+            case "character":
+                current = characters.setdefault(speaker_name(text), len(characters))
+                speakers.append(NO_SPEAKER)
+            case "dialogue" | "parenthetical":
+                speakers.append(current)
+            case _:
+                current = NO_SPEAKER
+                speakers.append(NO_SPEAKER)
+    return list(characters), speakers
+
+
+def _character_postings(
+    characters: Sequence[str], speakers: array
+) -> tuple[array, array]:
+    """Lay out the elements spoken by each character, in the order of `characters`."""
+    spoken: list[list[int]] = [[] for _ in characters]
+    for element, speaker in enumerate(speakers):
+        if speaker != NO_SPEAKER:
+            spoken[speaker].append(element)
+    ends = array("I")
+    flat = array("I")
+    for elements in spoken:
+        flat.extend(elements)
+        ends.append(len(flat))
+    return ends, flat
+
+
+def _postings(content: Iterable[tuple[str, str]]) -> dict[str, list[int]]:
+    postings: defaultdict[str, list[int]] = defaultdict(list)
+    for element, (_, text) in enumerate(content):
+        for position, token in enumerate(tokenize(text)):
+            postings[token].extend((element, position))
+    return postings
+
+
+def _vocabulary(
+    postings: dict[str, list[int]],
+) -> tuple[array, bytearray, array, array]:
+    """Lay out the sorted tokens, and their postings in the same order."""
+    term_ends = array("I")
+    text = bytearray()
+    posting_ends = array("I")
+    flat_postings = array("I")
+    for term in sorted(postings):
+        text += term.encode("utf-8")
+        term_ends.append(len(text))
+        flat_postings.extend(postings[term])
+        posting_ends.append(len(flat_postings) // 2)
+    return term_ends, text, posting_ends, flat_postings
+
+
+def write_segment(transcript: Transcript, path: Path):
+    """Index a transcript, replacing the segment at `path` atomically."""
+    content = transcript.content
+    if not isinstance(content, PackedContent):
+        content = PackedContent(content)
+    tags, ends, text = content.buffers()
+    characters, speakers = _speakers(content)
+    names = json.dumps(characters).encode("utf-8")
+    character_ends, spoken = _character_postings(characters, speakers)
+    term_ends, vocabulary, posting_ends, postings = _vocabulary(_postings(content))
+
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        sys.byteorder == "big",
+        len(tags),
+        len(text),
+        len(names),
+        len(characters),
+        len(spoken),
+        len(term_ends),
+        len(vocabulary),
+        len(postings) // 2,
+    )
+    _write_sections(
+        [
+            header,
+            names,
+            tags,
+            ends,
+            text,
+            speakers,
+            character_ends,
+            spoken,
+            term_ends,
+            vocabulary,
+            posting_ends,
+            postings,
+        ],
+        path,
+    )
+
+
+def _write_sections(sections: Iterable[bytes | bytearray | array], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix(".tmp")
+    with tmp_file.open("wb") as f:
+        for section in sections:
+            size = memoryview(section).nbytes
+            f.write(section)
+            f.write(bytes(padding(size)))
+    os.replace(tmp_file, path)
+
+
+class _Vocabulary(Sequence[str]):
+    """The sorted tokens of a segment, decoded as they are compared."""
+
+    def __init__(self, ends: memoryview, text: memoryview):
+        self._ends = ends
+        self._text = text
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        start = self._ends[index - 1] if index > 0 else 0
+        return str(self._text[start : self._ends[index]], "utf-8")
+
+
+def _split_sections(
+    data: memoryview, counts: Sequence[int], path: str | Path
+) -> list[memoryview]:
+    count, text_len, names_len, characters, spoken, terms, vocabulary_len, postings = (
+        counts
+    )
+    sizes = [
+        HEADER.size,
+        names_len,
+        count,
+        END_SIZE * count,
+        text_len,
+        SPEAKER_SIZE * count,
+        OFFSET_SIZE * characters,
+        OFFSET_SIZE * spoken,
+        OFFSET_SIZE * terms,
+        vocabulary_len,
+        OFFSET_SIZE * terms,
+        2 * OFFSET_SIZE * postings,
+    ]
+    starts = [0]
+    for size in sizes:
+        starts.append(starts[-1] + size + padding(size))
+    # Checked before slicing, so that no view is left holding the file open
+    if starts[-1] != len(data):
+        msg = f"{path} is the wrong size for its contents"
+        raise InvalidSegmentError(msg)
+    return [
+        data[start : start + size] for start, size in zip(starts, sizes, strict=False)
+    ]
+
+
+class Segment:
+    """An open segment file, which reads from the mapped file as it is queried.
+
+    The file stays mapped until `close`, which is also called on leaving a
+    `with` block.
+    """
+
+    def __init__(self, path: str | Path):
+        """Map a segment written by `write_segment`.
+
+        Raises:
+            InvalidSegmentError: if the file isn't a segment in this version of
+                the format, or was written on a machine with another byte order
+
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                msg = f"{path} is too short to be a segment"
+                raise InvalidSegmentError(msg)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Every view of the file, which must be released before it is unmapped
+        self._views = [memoryview(self._mmap)]
+        try:
+            self._read_sections(self._views[0])
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_sections(self, data: memoryview):
+        counts = HEADER.unpack_from(data)
+        if counts[:3] != (MAGIC, VERSION, sys.byteorder == "big"):
+            msg = f"{self.path} is not a segment in this version of the format"
+            raise InvalidSegmentError(msg)
+        sections = _split_sections(data, counts[3:], self.path)
+        self._views += sections
+        (
+            names,
+            tags,
+            ends,
+            text,
+            speakers,
+            character_ends,
+            spoken,
+            term_ends,
+            vocab,
+            posting_ends,
+            flat,
+        ) = sections[1:]
+        # Segments are only written by `write_segment`, so the content isn't
+        # checked, which would read all of it
+        self.content = PackedContent.from_buffers_unchecked(
+            tags, self._cast(ends, "Q"), text
+        )
+        self.speakers = self._cast(speakers, "H")
+        self._character_ends = self._cast(character_ends, "I")
+        self._spoken = self._cast(spoken, "I")
+        self.vocabulary = _Vocabulary(self._cast(term_ends, "I"), vocab)
+        self._posting_ends = self._cast(posting_ends, "I")
+        self._postings = self._cast(flat, "I")
+        try:
+            self.characters: list[str] = json.loads(bytes(names))
+        except ValueError as e:
+            msg = f"Invalid segment {self.path}: {e}"
+            raise InvalidSegmentError(msg) from e
+        if len(self._character_ends) != len(self.characters):
+            msg = f"Invalid segment {self.path}: wrong number of characters"
+            raise InvalidSegmentError(msg)
+
+    def _cast(self, view: memoryview, code: str) -> memoryview:
+        cast = view.cast(code)
+        self._views.append(cast)
+        return cast
+
+    def close(self):
+        """Unmap the file, after which the segment and its content can't be used."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object):
+        self.close()
+
+    def postings(self, token: str) -> list[Posting]:
+        """Get the element and position of each occurrence of `token`."""
+        index = bisect.bisect_left(self.vocabulary, token)
+        if index == len(self.vocabulary) or self.vocabulary[index] != token:
+            return []
+        start = self._posting_ends[index - 1] if index > 0 else 0
+        flat = self._postings[2 * start : 2 * self._posting_ends[index]]
+        return list(zip(flat[::2], flat[1::2], strict=True))
+
+    def spoken_by(self, character: str) -> list[int]:
+        """Get the elements spoken by a character, by the name in `characters`."""
+        if character not in self.characters:
+            return []
+        index = self.characters.index(character)
+        start = self._character_ends[index - 1] if index > 0 else 0
+        return self._spoken[start : self._character_ends[index]].tolist()
+
+    def speaker(self, element: int) -> str | None:
+        speaker = self.speakers[element]
+        return None if speaker == NO_SPEAKER else self.characters[speaker]
+
+    def find_phrase(self, tokens: Sequence[str]) -> set[int]:
+        """Find the elements containing the tokens next to each other, in order."""
+        if not tokens:
+            return set(range(len(self.content)))
+        starts = set(self.postings(tokens[0]))
+        for offset, token in enumerate(tokens[1:], 1):
+            following = set(self.postings(token))
+            starts = {
+                (element, position)
+                for element, position in starts
+                if (element, position + offset) in following
+            }
+            if not starts:
+                break
+        return {element for element, _ in starts}
+
+    def find(
+        self, phrases: Iterable[Sequence[str]], character: str | None = None
+    ) -> list[int]:
+        """Find the elements containing every phrase, optionally said by `character`.
+
+        Args:
+            phrases: each phrase as a list of tokens, from `tokenize`
+            character: a name to match against the speaker of each element
+
+        """
+        elements = None
+        if character is not None:
+            elements = set(self.spoken_by(speaker_name(character)))
+            if not elements:
+                return []
+        for phrase in phrases:
+            found = self.find_phrase(phrase)
+            elements = found if elements is None else elements & found
+            if not elements:
+                return []
+        if elements is None:
+            return list(range(len(self.content)))
+        return sorted(elements)
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+from ..transcript import Transcript
+from .segment import (
+    HEADER,
+    InvalidSegmentError,
+    Segment,
+    speaker_name,
+    tokenize,
+    write_segment,
+)
+
+
+@pytest.fixture
+def segment(tmp_path: Path) -> Segment:
+    transcript = Transcript(
+        content=[
+            ("direction", "SFX: CHIME OF THE FRONT DOOR OPENING."),
+            ("character", "GLORIA:"),
+            ("dialogue", "Um... Hello?"),
+            ("character", "CASPAR:"),
+            ("parenthetical", "(from the kitchen)"),
+            ("dialogue", "Welcome to Midnight Burger! I’m Caspar."),
+            ("direction", "A PAN CLATTERS."),
+            ("character", "GLORIA: (CONT'D)"),
+            ("dialogue", "Is this Midnight Burger?"),
+        ]
+    )
+    path = tmp_path / "script.seg"
+    write_segment(transcript, path)
+    return Segment(path)
+
+
+@pytest.mark.parametrize(
+    ("text", "tokens"),
+    [
+        ("Um... Hello?", ["um", "hello"]),
+        ("I’m Caspar's", ["i'm", "caspar's"]),
+        ("SFX: A 24-HOUR DINER", ["sfx", "a", "24", "hour", "diner"]),
+        ("...", []),
+    ],
+)
+def test_tokenize(text: str, tokens: list[str]):
+    assert tokenize(text) == tokens
+
+
+@pytest.mark.parametrize(
+    "text", ["GLORIA", "GLORIA:", "Gloria: (CONT'D)", "GLORIA (CONT’D)", " GLORIA "]
+)
+def test_speaker_name(text: str):
+    assert speaker_name(text) == "GLORIA"
+
+
+def test_content(segment: Segment):
+    assert segment.content[2] == ("dialogue", "Um... Hello?")
+    assert segment.characters == ["GLORIA", "CASPAR"]
+    assert [segment.speaker(i) for i in range(len(segment.content))] == [
+        None,
+        None,
+        "GLORIA",
+        None,
+        "CASPAR",
+        "CASPAR",
+        None,
+        None,
+        "GLORIA",
+    ]
+
+
+def test_postings(segment: Segment):
+    assert segment.postings("midnight") == [(5, 2), (8, 2)]
+    assert segment.postings("i'm") == [(5, 4)]
+    assert segment.postings("missing") == []
+    assert list(segment.vocabulary) == sorted(segment.vocabulary)
+
+
+def test_find(segment: Segment):
+    assert segment.find([["midnight", "burger"]]) == [5, 8]
+    assert segment.find([["burger", "midnight"]]) == []
+    assert segment.find([["midnight"], ["welcome"]]) == [5]
+    assert segment.find([["midnight"]], character="Gloria") == [8]
+    assert segment.find([], character="caspar:") == [4, 5]
+    assert segment.find([["hello"]], character="LEIF") == []
+
+
+def test_invalid(segment: Segment):
+    data = segment.path.read_bytes()
+    segment.path.write_bytes(data[:-8])
+    with pytest.raises(InvalidSegmentError, match="wrong size"):
+        Segment(segment.path)
+
+    segment.path.write_bytes(b"MBTR" + data[4:])
+    with pytest.raises(InvalidSegmentError, match="not a segment"):
+        Segment(segment.path)
+
+    segment.path.write_bytes(data[: HEADER.size - 1])
+    with pytest.raises(InvalidSegmentError, match="too short"):
+        Segment(segment.path)
+
+
+def test_spoken_by(segment: Segment):
+    assert segment.spoken_by("GLORIA") == [2, 8]
+    assert segment.spoken_by("CASPAR") == [4, 5]
+    assert segment.spoken_by("LEIF") == []
+
+
+def test_close(segment: Segment):
+    with segment:
+        assert segment.content[2] == ("dialogue", "Um... Hello?")
+    with pytest.raises(ValueError, match="released"):
+        segment.content[2]
@@ -0,0 +1,104 @@
+"""A cache in an SQLite database, shared by the feed and element caches."""
+
+import os
+import pickle
+import sqlite3
+from collections.abc import Callable, Iterator, MutableMapping
+from pathlib import Path
+from typing import Any, Self
+
+# How long to wait for another process to finish writing, in seconds
+BUSY_TIMEOUT = 30
+
+
+def _pickle(value: Any) -> bytes:
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+class SqliteCache(MutableMapping[str, Any]):
+    """A cache which stores each key as its own row in an SQLite database.
+
+    Values are pickled individually, unless `dumps` and `loads` are given to
+    turn them into bytes and back. Reading a key only loads that row, and each
+    write is committed straight away in its own transaction. The database uses
+    write-ahead logging, so several converter processes can read and write it at
+    the same time.
+
+    The database is opened on first access, and can be closed by using the cache
+    as a context manager.
+    """
+
+    def __init__(
+        self,
+        cache_file: str | Path,
+        dumps: Callable[[Any], bytes] = _pickle,
+        loads: Callable[[bytes], Any] = pickle.loads,
+    ):
+        self.cache_file = Path(cache_file)
+        self._dumps = dumps
+        self._loads = loads
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    def open(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(self.cache_file, timeout=BUSY_TIMEOUT)
+        self._pid = os.getpid()
+        with self._connection as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object):
+        self.close()
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # A connection must not be used across a fork, so child processes open
+        # their own
+        if self._connection is None or self._pid != os.getpid():
+            self.open()
+        assert self._connection is not None
+        return self._connection
+
+    def __getitem__(self, key: str) -> Any:
+        row = self._db.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return self._loads(row[0])
+
+    def __setitem__(self, key: str, value: Any):
+        with self._db as db:
+            db.execute(
+                "INSERT INTO entries (key, value) VALUES (?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, self._dumps(value)),
+            )
+
+    def __delitem__(self, key: str):
+        with self._db as db:
+            cursor = db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        row = self._db.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._db.execute("SELECT key FROM entries ORDER BY key").fetchall()
+        return (key for (key,) in keys)
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,63 @@
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+
+from .sqlite_cache import SqliteCache
+
+
+def test_sqlite_cache(tmp_path: Path):
+    test_cache_file = tmp_path / "cache.sqlite3"
+    test_cache = SqliteCache(test_cache_file)
+
+    assert "foo" not in test_cache
+    test_cache["foo"] = {"bar": [1, 2]}
+    assert test_cache["foo"] == {"bar": [1, 2]}
+
+    # writes are visible to other connections straight away
+    test_cache_2 = SqliteCache(test_cache_file)
+    assert test_cache_2["foo"] == {"bar": [1, 2]}
+    test_cache_2["foo"] = "baz"
+    assert test_cache["foo"] == "baz"
+
+    assert list(test_cache) == ["foo"]
+    assert len(test_cache) == 1
+    del test_cache["foo"]
+    assert len(test_cache_2) == 0
+    with pytest.raises(KeyError):
+        test_cache["foo"]
+
+    test_cache.close()
+    test_cache_2.close()
+
+
+def _write_keys(cache_file: Path, worker: int):
+    cache = SqliteCache(cache_file)
+    for i in range(20):
+        cache[f"{worker}-{i}"] = i
+    cache.close()
+
+
+def test_sqlite_cache_shared_between_processes(tmp_path: Path):
+    test_cache_file = tmp_path / "cache.sqlite3"
+    workers = range(4)
+
+    with ProcessPoolExecutor(max_workers=len(workers)) as executor:
+        list(executor.map(_write_keys, [test_cache_file] * len(workers), workers))
+
+    test_cache = SqliteCache(test_cache_file)
+    assert set(test_cache) == {f"{w}-{i}" for w in workers for i in range(20)}
+    test_cache.close()
+
+
+def test_sqlite_cache_stores_bytes_as_they_are(tmp_path: Path):
+    cache_file = tmp_path / "cache.sqlite3"
+    with SqliteCache(cache_file, dumps=bytes, loads=bytes) as cache:
+        cache["foo"] = b"compressed"
+        assert cache["foo"] == b"compressed"
+
+    with closing(sqlite3.connect(cache_file)) as db:
+        rows = db.execute("SELECT key, value FROM entries").fetchall()
+    assert rows == [("foo", b"compressed")]
@@ -1,18 +1,25 @@
 import logging
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Literal, Optional, Self
+from operator import itemgetter
+from typing import Literal, Optional, Self, get_args, overload
 
 logger = logging.getLogger(__name__)
 
 type Tag = Literal["direction", "character", "parenthetical", "dialogue", "end"]
-type Content = list[tuple[Tag, str]]
+type Element = tuple[Tag, str]
+type Content = list[Element]
+
+TAGS: tuple[Tag, ...] = get_args(Tag.__value__)
+_TAG_CODES: dict[str, int] = {tag: code for code, tag in enumerate(TAGS)}
 
 
 type HugoFrontmatter = dict[str, str | HugoFrontmatter]
 
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     episode_title: Optional[str] = None
     series: Optional[str] = None
@@ -27,20 +34,193 @@ class Metadata:
                 setattr(self, field.name, getattr(other, field.name))
 
 
+# Every byte of a UTF-8 character after the first is 0b10xxxxxx
+UTF8_CONTINUATION = 0b10
+# Maps the continuation bytes to 1 and every other byte to 0
+_CONTINUATION_BYTES = bytes(byte >> 6 == UTF8_CONTINUATION for byte in range(256))
+
+# The boundary files holding packed content start each buffer on, so that the
+# ends can be cast in place
+BUFFER_ALIGNMENT = 8
+
+
+def padding(length: int) -> int:
+    """Count the bytes needed after `length` bytes to reach a buffer boundary."""
+    return -length % BUFFER_ALIGNMENT
+
+
+class PackedContent(Sequence[Element]):
+    """Content packed into as little memory as possible, for holding many transcripts.
+
+    The tags are stored as one byte each, and the text of every element in a
+    single UTF-8 buffer, with the offset of the end of each element. Elements
+    are unpacked into tuples as they are read. Packed content can't be changed
+    in place, but the transforms in `transcript_utils` only read the content
+    and build a new list.
+
+    The three buffers can also be views of memory the content doesn't own. They
+    are checked by `from_buffers`, which reads all of the text once, or wrapped
+    as they are by `from_buffers_unchecked`, in which case nothing is read until
+    it is used.
+    """
+
+    __slots__ = ("_ends", "_tags", "_text")
+
+    _tags: Sequence[int]
+    _ends: Sequence[int]
+    _text: bytes | memoryview
+
+    def __init__(self, content: Iterable[Element] = ()):
+        tags = array("B")
+        ends = array("Q")
+        text = bytearray()
+        for tag, element_text in content:
+            tags.append(_TAG_CODES[tag])
+            text += element_text.encode("utf-8")
+            ends.append(len(text))
+        self._tags = tags
+        self._ends = ends
+        self._text = bytes(text)
+
+    @classmethod
+    def from_buffers(
+        cls,
+        tags: Sequence[int],
+        ends: Sequence[int],
+        text: bytes | memoryview,
+    ) -> Self:
+        """Wrap existing buffers, in the layout described by `buffers`.
+
+        Every element is checked to decode, by reading the whole text.
+
+        Raises:
+            ValueError: if the buffers don't fit together: the offsets must only
+                increase, stay within the text, and fall between the characters
+                of valid UTF-8
+
+        """
+        if len(tags) != len(ends) or (len(ends) and ends[-1] > len(text)):
+            msg = "The tags, ends and text of packed content don't match"
+            raise ValueError(msg)
+        # Every element starts and ends on a character, including the first and
+        # last, which also makes sure there are enough offsets for itemgetter
+        # to return a tuple
+        offsets = [0, *ends, len(text)]
+        if offsets != sorted(offsets):
+            msg = "The ends of packed content go backwards"
+            raise ValueError(msg)
+        # With an extra byte, for the offsets at the end of the text
+        continuations = bytes(text).translate(_CONTINUATION_BYTES) + b"\0"
+        if any(itemgetter(*offsets)(continuations)):
+            msg = "Packed content is split inside a UTF-8 character"
+            raise ValueError(msg)
+        # Python can only check UTF-8 by decoding it
+        str(text, "utf-8")
+        return cls.from_buffers_unchecked(tags, ends, text)
+
+    @classmethod
+    def from_buffers_unchecked(
+        cls,
+        tags: Sequence[int],
+        ends: Sequence[int],
+        text: bytes | memoryview,
+    ) -> Self:
+        """Wrap buffers from a trusted source as they are, without reading them."""
+        content = cls.__new__(cls)
+        content._tags = tags
+        content._ends = ends
+        content._text = text
+        return content
+
+    def buffers(self) -> tuple[memoryview, memoryview, memoryview]:
+        """Get the tag codes, the end offset of each element, and the text."""
+        return memoryview(self._tags), memoryview(self._ends), memoryview(self._text)
+
+    def __reduce__(self):
+        tags, ends, text = self.buffers()
+        return (
+            PackedContent.from_buffers_unchecked,
+            (bytes(tags), array("Q", ends.tolist()), bytes(text)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    @overload
+    def __getitem__(self, index: int) -> Element: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PackedContent": ...
+
+    def __getitem__(self, index: int | slice) -> "Element | PackedContent":
+        if isinstance(index, slice):
+            return PackedContent(
+                self._element(i) for i in range(*index.indices(len(self)))
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = "PackedContent index out of range"
+            raise IndexError(msg)
+        return self._element(index)
+
+    def _element(self, i: int) -> Element:
+        start = self._ends[i - 1] if i > 0 else 0
+        text = str(self._text[start : self._ends[i]], "utf-8")
+        return TAGS[self._tags[i]], text
+
+    def __iter__(self) -> Iterator[Element]:
+        text = self._text
+        start = 0
+        for code, end in zip(self._tags, self._ends, strict=True):
+            yield TAGS[code], str(text[start:end], "utf-8")
+            start = end
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PackedContent):
+            return self.buffers() == other.buffers()
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    # Like a list, packed content is compared by value so it can't be hashed
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PackedContent({list(self)!r})"
+
+
 class Transcript:
     """Represents a transcript in a format agnostic way.
 
     Used as an intermediate step when converting.
     """
 
-    content: Content
+    content: Content | PackedContent
     metadata: Metadata
 
     def __init__(
-        self, metadata: Metadata | None = None, content: Content | None = None
+        self,
+        metadata: Metadata | None = None,
+        content: Content | PackedContent | None = None,
     ):
         self.metadata = Metadata() if metadata is None else metadata
         self.content = [] if content is None else content
 
     def add_content(self, tag: Tag, content: str):
+        """Append an element to the content.
+
+        Raises:
+            TypeError: if the content has been packed
+
+        """
+        if isinstance(self.content, PackedContent):
+            msg = "packed content is read-only"
+            raise TypeError(msg)
         self.content.append((tag, content))
+
+    def pack(self) -> Self:
+        """Pack the content into a `PackedContent`, which can no longer be added to."""
+        if not isinstance(self.content, PackedContent):
+            self.content = PackedContent(self.content)
+        return self
@@ -1,4 +1,18 @@
-from .transcript import Metadata
+import pickle
+from array import array
+
+import pytest
+
+from .transcript import Metadata, PackedContent, Transcript
+from .transcript_utils import extract_parentheticals
+
+CONTENT = [
+    ("direction", "A BELL RINGS AS THE DOOR OPENS."),
+    ("character", "BUD"),
+    ("dialogue", "(quietly) Welcome to Midnight Burger."),
+    ("direction", ""),
+    ("end", "THE END – café ☕"),
+]
 
 
 def test_merge_metadata():
@@ -7,3 +21,74 @@ def test_merge_metadata():
     m1.merge(m2)
 
     assert m1 == Metadata(episode_title="Panopticon", season=4)
+
+
+def test_metadata_is_slotted():
+    with pytest.raises(AttributeError):
+        Metadata().episode_titel = "Panopticon"  # type: ignore[attr-defined]
+
+
+def test_packed_content():
+    packed = PackedContent(CONTENT)
+
+    assert len(packed) == len(CONTENT)
+    assert list(packed) == CONTENT
+    assert [packed[i] for i in range(len(CONTENT))] == CONTENT
+    assert packed[-1] == CONTENT[-1]
+    assert packed[1:4] == CONTENT[1:4]
+    assert packed[::-2] == CONTENT[::-2]
+    assert packed == CONTENT
+    assert packed == PackedContent(CONTENT)
+    assert packed != CONTENT[:-1]
+    assert ("character", "BUD") in packed
+    assert pickle.loads(pickle.dumps(packed)) == packed
+    with pytest.raises(IndexError):
+        packed[len(CONTENT)]
+
+
+def test_packed_transcript_passes():
+    expected = Transcript(content=list(CONTENT))
+    extract_parentheticals(expected)
+
+    transcript = Transcript(content=list(CONTENT)).pack()
+    assert isinstance(transcript.content, PackedContent)
+    extract_parentheticals(transcript)
+
+    assert transcript.content == expected.content
+
+
+def test_packed_content_is_read_only():
+    transcript = Transcript(content=[("direction", "A BELL RINGS.")])
+    transcript.add_content("character", "BUD")
+    transcript.pack()
+
+    with pytest.raises(TypeError, match="packed content is read-only"):
+        transcript.add_content("dialogue", "Welcome.")
+    assert list(transcript.content) == [
+        ("direction", "A BELL RINGS."),
+        ("character", "BUD"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("tags", "ends", "text"),
+    [
+        (b"\x00", array("Q", [1, 2]), b"ab"),
+        (b"\x00\x00", array("Q", [1, 3]), b"ab"),
+        (b"\x00\x00", array("Q", [2, 1]), b"ab"),
+        (b"\x00\x00", array("Q", [1, 3]), "é!".encode()),
+        (b"\x00", array("Q", [1]), b"\xff"),
+    ],
+    ids=["lengths", "past-end", "backwards", "split-character", "utf-8"],
+)
+def test_from_buffers_checks_layout(tags: bytes, ends: array, text: bytes):
+    with pytest.raises(ValueError, match=r"(?i)packed content|utf-8"):
+        PackedContent.from_buffers(tags, ends, text)
+
+
+def test_from_buffers_unchecked():
+    content = PackedContent([("direction", "A BELL RINGS."), ("character", "BUD")])
+    unchecked = PackedContent.from_buffers_unchecked(*content.buffers())
+
+    assert unchecked == content
+    assert unchecked.buffers() == content.buffers()
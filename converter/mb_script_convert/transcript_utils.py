@@ -1,7 +1,8 @@
 import logging
 import re
+from collections.abc import Iterable, Iterator
 
-from .transcript import Transcript
+from .transcript import Element, Transcript
 
 logger = logging.getLogger(__name__)
 
@@ -25,40 +26,59 @@ def _parse_parenthetical(text: str):
 
 
 def extract_parentheticals(transcript: Transcript):
-    i = 0
-    while i < len(transcript.content):
-        tag, text = transcript.content[i]
-        if tag == "dialogue":
-            parenthetical, rest = _parse_parenthetical(text)
+    transcript.content = list(_extract_parentheticals(transcript.content))
+
+
+def _extract_parentheticals(content: Iterable[Element]) -> Iterator[Element]:
+    elements = iter(content)
+    for tag, text in elements:
+        if tag != "dialogue":
+            yield (tag, text)
+            continue
+        remaining = text
+        while True:
+            parenthetical, rest = _parse_parenthetical(remaining)
             if rest is None:
-                assert i < len(transcript.content) - 1
-                next_tag, next_text = transcript.content[i + 1]
+                # the parenthetical continues into the next line of dialogue
+                following = next(elements, None)
+                assert following is not None
+                next_tag, next_text = following
                 assert next_tag == "dialogue"
-                transcript.content[i] = ("dialogue", f"{parenthetical} {next_text}")
-                del transcript.content[i + 1]
-                continue  # continue without incrementing i
+                remaining = f"{parenthetical} {next_text}"
             elif parenthetical:
-                transcript.content[i] = ("parenthetical", parenthetical)
-                if len(rest) > 0:
-                    transcript.content.insert(i + 1, ("dialogue", rest))
-        i += 1
+                yield ("parenthetical", parenthetical)
+                if len(rest) == 0:
+                    break
+                # the rest may start with another parenthetical
+                remaining = rest
+            else:
+                yield ("dialogue", remaining)
+                break
 
 
 def combine_more(transcript: Transcript):
-    i = 0
-    while i < len(transcript.content):
-        tag, text = transcript.content[i]
+    transcript.content = list(_combine_more(transcript.content))
+
+
+def _combine_more(content: Iterable[Element]) -> Iterator[Element]:
+    elements = iter(content)
+    element = next(elements, None)
+    while element is not None:
+        tag, text = element
+        following = next(elements, None)
         if tag == "direction" and "(MORE)" in text:
-            assert i < len(transcript.content) - 1
-            _, contd = transcript.content[i + 1]
+            assert following is not None
+            _, contd = following
             if "(CONT'D)" not in contd.replace("’", "'"):
                 logger.warning(
                     "(CONT'D) not found after (MORE). Instead found %s", contd
                 )
             else:
-                del transcript.content[i : i + 2]
+                # drop both the (MORE) and the (CONT'D)
+                element = next(elements, None)
                 continue
-        i += 1
+        yield element
+        element = following
 
 
 def split_short_dialogue(transcript: Transcript):
@@ -68,18 +88,35 @@ def split_short_dialogue(transcript: Transcript):
     This function finds these cases and splits them out.
     """
     characters = {el[1] for el in transcript.content if el[0] == "character"}
+    transcript.content = list(
+        _split_short_dialogue(transcript.content, _speaker_pattern(characters))
+    )
 
-    for i, (tag, text) in enumerate(transcript.content):
-        if tag != "direction":
-            continue
-        for character in characters:
-            if match := re.match(
-                r"({0}(?: \(CONT['’]D\))?) (.*[a-z].*)".format(re.escape(character)),
-                text,
-            ):
-                extracted = match.groups()
-                # mutating the list here is the cleanest implementation
-                transcript.content[i : i + 1] = [  # noqa: B909
-                    ("character", extracted[0]),
-                    ("dialogue", extracted[1]),
-                ]
+
+def _speaker_pattern(characters: Iterable[str]) -> re.Pattern[str] | None:
+    """Compile a pattern matching a line which starts with any of the characters.
+
+    Longer names are tried first, so that "TED BOT Yes." is split after
+    "TED BOT" rather than "TED".
+    """
+    names = sorted(characters, key=lambda name: (-len(name), name))
+    if len(names) == 0:
+        return None
+    alternation = "|".join(re.escape(name) for name in names)
+    return re.compile(rf"((?:{alternation})(?: \(CONT['’]D\))?) (.*[a-z].*)")
+
+
+def _split_short_dialogue(
+    content: Iterable[Element], speaker: re.Pattern[str] | None
+) -> Iterator[Element]:
+    for tag, text in content:
+        if (
+            tag == "direction"
+            and speaker is not None
+            and (match := speaker.match(text))
+        ):
+            character, dialogue = match.groups()
+            yield ("character", character)
+            yield ("dialogue", dialogue)
+        else:
+            yield (tag, text)
@@ -51,6 +51,14 @@ def test__parse_parenthetical():
             [("parenthetical", "(foo bar)")],
         ),
         ([("dialogue", "(foo)")], [("parenthetical", "(foo)")]),
+        (
+            [("dialogue", "(foo) (bar) baz")],
+            [
+                ("parenthetical", "(foo)"),
+                ("parenthetical", "(bar)"),
+                ("dialogue", "baz"),
+            ],
+        ),
     ],
 )
 def test_extract_parentheticals(content_in, content_out):
@@ -68,6 +76,11 @@ def test_extract_parentheticals(content_in, content_out):
         # continued marker with curly apostrophe
         ([("direction", "(MORE)"), ("direction", "(CONT’D)")], []),
         ([("direction", "(MORE)"), ("direction", "AVA (CONT'D)")], []),
+        # no continued marker, so nothing is removed
+        (
+            [("direction", "(MORE)"), ("direction", "(MORE)"), ("dialogue", "foo")],
+            [("direction", "(MORE)"), ("direction", "(MORE)"), ("dialogue", "foo")],
+        ),
         (
             [
                 ("dialogue", "foo"),
@@ -188,6 +201,30 @@ def test_combine_more(content_in, content_out):
                 ("dialogue", "... yes."),
             ],
         ),
+        (
+            [  # One character's name is the start of another's
+                ("character", "TED"),
+                ("dialogue", "Yes, thank you."),
+                ("character", "TED BOT"),
+                ("dialogue", "Yes, thank you."),
+                ("direction", "TED BOT Yes."),
+                ("direction", "TED Yes."),
+            ],
+            [
+                ("character", "TED"),
+                ("dialogue", "Yes, thank you."),
+                ("character", "TED BOT"),
+                ("dialogue", "Yes, thank you."),
+                ("character", "TED BOT"),
+                ("dialogue", "Yes."),
+                ("character", "TED"),
+                ("dialogue", "Yes."),
+            ],
+        ),
+        (
+            [("direction", "NOBODY HAS SPOKEN YET")],
+            [("direction", "NOBODY HAS SPOKEN YET")],
+        ),
         (
             [  # A character with a regex metacharacter
                 ("character", "WHO?"),
@@ -0,0 +1,66 @@
+"""Find the PDFs which have changed, for reconverting them as they are edited."""
+
+import time
+from pathlib import Path
+
+# How long a PDF must stay unchanged before it is converted, in seconds, so
+# that a file which is still being written isn't converted half way through
+DEBOUNCE = 0.5
+
+type Stat = tuple[int, int]
+
+
+class PollingWatcher:
+    """Finds changed PDFs by comparing the modification time and size of each one.
+
+    A PDF is reported once it has been created or modified, and then left alone
+    for `debounce` seconds. The PDFs which exist when the watcher is created are
+    taken as the starting point, so they are only reported if they change.
+    Other files can be watched by giving a glob `pattern` to match them with.
+    """
+
+    def __init__(
+        self, root: Path, debounce: float = DEBOUNCE, pattern: str = "**/*.pdf"
+    ):
+        self.root = root
+        self.debounce = debounce
+        self.pattern = pattern
+        self.seen = self._scan()
+        self.pending: dict[Path, tuple[Stat, float]] = {}
+
+    def _scan(self) -> dict[Path, Stat]:
+        paths = [self.root] if self.root.is_file() else self.root.glob(self.pattern)
+        stats = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Deleted since it was listed
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """Get the PDFs which have changed and settled since the last poll."""
+        if now is None:
+            now = time.monotonic()
+        current = self._scan()
+
+        for path, stat in current.items():
+            if self.seen.get(path) == stat:
+                continue
+            pending = self.pending.get(path)
+            if pending is None or pending[0] != stat:
+                self.pending[path] = (stat, now)
+
+        settled = []
+        for path, (stat, changed_at) in list(self.pending.items()):
+            if path not in current:
+                del self.pending[path]
+            elif now - changed_at >= self.debounce:
+                del self.pending[path]
+                self.seen[path] = stat
+                settled.append(path)
+        for path in self.seen.keys() - current.keys():
+            del self.seen[path]
+        return sorted(settled)
@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+from .watch import PollingWatcher
+
+
+def _touch(path: Path, content: bytes, mtime_ns: int):
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_polling_watcher(tmp_path: Path):
+    existing = tmp_path / "existing.pdf"
+    _touch(existing, b"old", 1)
+    (tmp_path / "notes.txt").write_text("not a pdf")
+    watcher = PollingWatcher(tmp_path, debounce=1.0)
+
+    assert watcher.poll(now=0) == []
+
+    new = tmp_path / "sub" / "new.pdf"
+    new.parent.mkdir()
+    _touch(new, b"new", 2)
+    assert watcher.poll(now=10) == []
+    # Still being written
+    _touch(new, b"newer", 3)
+    assert watcher.poll(now=10.5) == []
+    assert watcher.poll(now=11) == []
+    assert watcher.poll(now=11.5) == [new]
+    assert watcher.poll(now=20) == []
+
+    _touch(existing, b"changed", 4)
+    assert watcher.poll(now=30) == []
+    assert watcher.poll(now=31) == [existing]
+
+
+def test_polling_watcher_forgets_deleted_files(tmp_path: Path):
+    pdf = tmp_path / "script.pdf"
+    watcher = PollingWatcher(tmp_path, debounce=1.0)
+
+    _touch(pdf, b"content", 1)
+    assert watcher.poll(now=0) == []
+    pdf.unlink()
+    assert watcher.poll(now=1) == []
+
+    _touch(pdf, b"content", 1)
+    assert watcher.poll(now=2) == []
+    assert watcher.poll(now=3) == [pdf]
+
+
+def test_polling_watcher_single_file(tmp_path: Path):
+    pdf = tmp_path / "script.pdf"
+    _touch(pdf, b"content", 1)
+    watcher = PollingWatcher(pdf, debounce=0)
+
+    assert watcher.poll(now=0) == []
+    _touch(pdf, b"content", 2)
+    assert watcher.poll(now=1) == [pdf]
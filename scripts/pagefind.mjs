@@ -0,0 +1,41 @@
+// Build the search index from the records written by the converter's
+// --pagefind-records, instead of crawling the built site.
+//
+// Usage: node scripts/pagefind.mjs RECORDS_DIR [SITE_DIR]
+//
+// The index is written to SITE_DIR/pagefind, with SITE_DIR defaulting to
+// public/, after Hugo has built the site.
+
+import { readdir, readFile } from "node:fs/promises";
+import path from "node:path";
+import * as pagefind from "pagefind";
+
+const [recordsDir, siteDir = "public"] = process.argv.slice(2);
+if (!recordsDir) {
+  console.error("Usage: node scripts/pagefind.mjs RECORDS_DIR [SITE_DIR]");
+  process.exit(2);
+}
+
+function check(errors) {
+  if (errors.length > 0) {
+    throw new Error(errors.join("\n"));
+  }
+}
+
+const files = (await readdir(recordsDir, { recursive: true }))
+  .filter((file) => file.endsWith(".json"))
+  .sort();
+
+const { index, errors } = await pagefind.createIndex();
+check(errors);
+try {
+  for (const file of files) {
+    const record = JSON.parse(await readFile(path.join(recordsDir, file)));
+    check((await index.addCustomRecord(record)).errors);
+  }
+  const outputPath = path.join(siteDir, "pagefind");
+  check((await index.writeFiles({ outputPath })).errors);
+  console.log(`Indexed ${files.length} transcripts into ${outputPath}`);
+} finally {
+  await pagefind.close();
+}